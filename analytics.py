@@ -0,0 +1,137 @@
+import collections
+import heapq
+import sqlite3
+import time
+
+# ==============================================================================
+# TICKET ANALYTICS
+# ==============================================================================
+# Every ticket open, first support reply and close is appended to an event log
+# in SQLite and folded into per-guild aggregates in memory as it happens.
+# At startup the log is replayed once to rebuild the aggregates, so
+# /ticket_stats never has to look at channel history or rescan the log.
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "n/a"
+    seconds = int(seconds)
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60}s"
+    if seconds < 86400:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    return f"{seconds // 86400}d {seconds % 86400 // 3600}h"
+
+
+class RunningMedian:
+    """
+    Two heaps (lower half as a max-heap, upper half as a min-heap): O(log n) to add, O(1) to read.
+    """
+    def __init__(self):
+        self._lower = []  # negated
+        self._upper = []
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self._lower and value > -self._lower[0]:
+            heapq.heappush(self._upper, value)
+        else:
+            heapq.heappush(self._lower, -value)
+        # Keep the lower half equal to or one larger than the upper half
+        if len(self._lower) > len(self._upper) + 1:
+            heapq.heappush(self._upper, -heapq.heappop(self._lower))
+        elif len(self._upper) > len(self._lower):
+            heapq.heappush(self._lower, -heapq.heappop(self._upper))
+
+    def median(self):
+        if not self._lower:
+            return None
+        if len(self._lower) > len(self._upper):
+            return -self._lower[0]
+        return (-self._lower[0] + self._upper[0]) / 2
+
+
+class GuildTicketStats:
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+        self.awaiting = 0  # open tickets without a support reply yet
+        self.first_response = RunningMedian()
+        self.resolution = RunningMedian()
+        self.responses_by_staff = collections.Counter()
+        self.closes_by_staff = collections.Counter()
+
+    @property
+    def open(self):
+        return self.opened - self.closed
+
+
+class TicketAnalytics:
+    """
+    Append-only ticket event log plus the aggregates derived from it.
+    `awaiting_response(channel_id)` is a dict lookup, cheap enough to call from on_message.
+    """
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS ticket_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, guild_id INTEGER NOT NULL, channel_id INTEGER NOT NULL, "
+            "number INTEGER, kind TEXT NOT NULL, actor_id INTEGER, at REAL NOT NULL)"
+        )
+        self.db.commit()
+        self.guilds = collections.defaultdict(GuildTicketStats)
+        self._open = {}  # channel_id -> [opened_at, responded, opener_id]
+
+        for guild_id, channel_id, number, kind, actor_id, at in self.db.execute(
+            "SELECT guild_id, channel_id, number, kind, actor_id, at FROM ticket_events ORDER BY id"
+        ):
+            self._apply(guild_id, channel_id, kind, actor_id, at)
+
+    def _apply(self, guild_id, channel_id, kind, actor_id, at):
+        stats = self.guilds[guild_id]
+        ticket = self._open.get(channel_id)
+        if kind == "open":
+            stats.opened += 1
+            stats.awaiting += 1
+            self._open[channel_id] = [at, False, actor_id]
+        elif kind == "first_response" and ticket and not ticket[1]:
+            ticket[1] = True
+            stats.awaiting -= 1
+            stats.first_response.add(at - ticket[0])
+            stats.responses_by_staff[actor_id] += 1
+        elif kind == "close" and ticket:
+            # Tickets opened before the log existed are not counted, so opened - closed stays correct
+            del self._open[channel_id]
+            if not ticket[1]:
+                stats.awaiting -= 1
+            stats.closed += 1
+            stats.resolution.add(at - ticket[0])
+            # Openers closing their own ticket are not staff work
+            if actor_id and actor_id != ticket[2]:
+                stats.closes_by_staff[actor_id] += 1
+
+    def _record(self, guild_id, channel_id, number, kind, actor_id):
+        at = time.time()
+        with self.db:
+            self.db.execute(
+                "INSERT INTO ticket_events (guild_id, channel_id, number, kind, actor_id, at) VALUES (?, ?, ?, ?, ?, ?)",
+                (guild_id, channel_id, number, kind, actor_id, at)
+            )
+        self._apply(guild_id, channel_id, kind, actor_id, at)
+
+    def opened(self, guild_id, channel_id, number, opener_id):
+        self._record(guild_id, channel_id, number, "open", opener_id)
+
+    def awaiting_response(self, channel_id):
+        ticket = self._open.get(channel_id)
+        return ticket is not None and not ticket[1]
+
+    def responded(self, guild_id, channel_id, number, staff_id):
+        if self.awaiting_response(channel_id):
+            self._record(guild_id, channel_id, number, "first_response", staff_id)
+
+    def closed(self, guild_id, channel_id, number, closed_by=None):
+        self._record(guild_id, channel_id, number, "close", closed_by)
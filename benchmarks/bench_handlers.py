@@ -0,0 +1,239 @@
+"""
+Load benchmark suite: replays traffic against the bot's handlers on the offline fake Discord layer.
+
+    python benchmarks/bench_handlers.py [--scale N] [--latency MS] [--ratelimit-scale F]
+                                        [--out PATH] [--baseline PATH]
+
+Scenarios: TicketView.create_ticket, CloseTicketView.close_ticket, /clean, /disconnect (command and
+timer firing), /bulk_disconnect on a full voice channel and on_member_join. Each reports throughput,
+p50/p99 latency, peak traced memory, HTTP calls and rate-limit waits. Results are written as JSON; pass a previous file as --baseline to flag
+throughput drops or p99 increases above --tolerance.
+
+--ratelimit-scale shrinks the rate-limit windows from fakediscord.DEFAULT_RATE_LIMITS so a run takes
+seconds rather than minutes while keeping the same bucket sizes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.json")
+# Paths on the command line are relative to where the suite was started
+START_DIR = os.getcwd()
+# The bot keeps its SQLite state and transcripts in the working directory
+os.chdir(tempfile.mkdtemp(prefix="lifegiver-bench-"))
+
+import lg
+from core import guild_config, resources, ticket_store
+from fakediscord import DEFAULT_RATE_LIMITS, FakeDiscord
+
+DAY = 24 * 60 * 60
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)] if ordered else 0.0
+
+
+async def timed(coro):
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+
+async def create_ticket(fake, scale):
+    guild = fake.add_guild(101, members=scale)
+    button = lg.client.extensions["cogs.tickets"].TicketView().children[0]
+    latencies = await asyncio.gather(*(
+        timed(button.callback(fake.interaction(guild, guild.get_member(user_id))))
+        for user_id in range(1, scale + 1)
+    ))
+    return latencies, scale
+
+
+async def close_ticket(fake, scale, messages_per_ticket=150):
+    guild = fake.add_guild(102, members=scale)
+    category = await resources.ensure_category(guild, guild_config.get(guild.id, "ticket_category"))
+    await asyncio.sleep(0.01)
+
+    # Seed open tickets straight into the fake and the index
+    channels = []
+    for user_id in range(1, scale + 1):
+        number = ticket_store.allocate(guild.id)
+        data = fake.http.add_channel({
+            "id": str(fake.http.snowflake()), "type": 0, "guild_id": str(guild.id), "name": f"ticket-{number:04d}",
+            "parent_id": str(category.id), "position": number, "permission_overwrites": [],
+        })
+        fake.state.parse_channel_create(data)
+        ticket_store.open(guild.id, number, int(data["id"]), user_id)
+        for i in range(messages_per_ticket):
+            fake.http.add_message(data["id"], user_id, f"message {i} in ticket {number}", age=messages_per_ticket - i)
+        channels.append((guild.get_channel(int(data["id"])), guild.get_member(user_id)))
+
+    button = lg.client.extensions["cogs.tickets"].CloseTicketView().children[0]
+    latencies = await asyncio.gather(*(
+        timed(button.callback(fake.interaction(guild, member, channel))) for channel, member in channels
+    ))
+    return latencies, scale
+
+
+async def clean(fake, scale):
+    guild = fake.add_guild(103, members=20)
+    channel = guild.text_channels[0]
+    total = scale * 10
+    # Mostly recent chatter plus an old tail that needs single deletes
+    for i in range(total):
+        age = 20 * DAY + i if i >= total * 0.8 else total - i
+        fake.http.add_message(channel.id, i % 20 + 1, f"chat line {i}", age=age, bot=i % 3 == 0)
+
+    interaction = fake.interaction(guild, guild.get_member(1), channel)
+    cog = lg.client.get_cog("Moderation")
+    latency = await timed(cog.clean.callback(cog, interaction, amount=total))
+    return [latency], total
+
+
+async def disconnect(fake, scale, delay=1):
+    guild = fake.add_guild(104, members=scale, voice_members=scale)
+    channel = guild.text_channels[0]
+    admin = guild.get_member(1)
+    cog = lg.client.get_cog("Voice")
+    latencies = await asyncio.gather(*(
+        timed(cog.disconnect.callback(cog, fake.interaction(guild, admin, channel), guild.get_member(user_id), seconds=delay))
+        for user_id in range(1, scale + 1)
+    ))
+    # Wait until every timer has fired and the voice states are gone
+    deadline = time.perf_counter() + delay
+    while any(member.voice for member in guild.members):
+        await asyncio.sleep(0.01)
+    fire_latency = time.perf_counter() - deadline
+    return list(latencies) + [fire_latency], scale
+
+
+async def bulk_disconnect(fake, scale):
+    guild = fake.add_guild(106, members=scale, voice_members=scale)
+    cog = lg.client.get_cog("Voice")
+    interaction = fake.interaction(guild, guild.get_member(1), guild.text_channels[0])
+    latency = await timed(cog.bulk_disconnect.callback(cog, interaction, channel=guild.voice_channels[0]))
+    return [latency], scale
+
+
+async def member_join(fake, scale):
+    guild = fake.add_guild(105, members=0)
+    sends_before = fake.http.calls["send_message"]
+    started = time.perf_counter()
+    for user_id in range(1, scale + 1):
+        fake.join(guild, 10_000 + user_id)
+        if user_id % 50 == 0:
+            await asyncio.sleep(0)
+    while fake.http.calls["send_message"] == sends_before:
+        await asyncio.sleep(0.005)
+    # Let any window that opened late flush too
+    await asyncio.sleep(lg.client.get_cog("Welcome").join_buffer.window * 2)
+    elapsed = time.perf_counter() - started
+    print(f"    {scale} joins -> {fake.http.calls['send_message'] - sends_before} welcome messages")
+    return [elapsed], scale
+
+
+SCENARIOS = [
+    ("create_ticket", create_ticket),
+    ("close_ticket", close_ticket),
+    ("clean", clean),
+    ("disconnect", disconnect),
+    ("bulk_disconnect", bulk_disconnect),
+    ("member_join", member_join),
+]
+
+
+async def run(args):
+    rate_limits = {route: (limit, per * args.ratelimit_scale) for route, (limit, per) in DEFAULT_RATE_LIMITS.items()}
+    fake = FakeDiscord(lg.client, latency=args.latency / 1000, rate_limits=rate_limits)
+    await fake.start()
+    fake.ready()
+    lg.client.get_cog("Welcome").join_buffer.window = 0.25
+
+    results = {}
+    tracemalloc.start()
+    for name, scenario in SCENARIOS:
+        calls_before = sum(fake.http.calls.values())
+        waits_before = fake.http.ratelimit_waits
+        tracemalloc.reset_peak()
+        base_memory = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        latencies, ops = await scenario(fake, args.scale)
+        elapsed = time.perf_counter() - started
+
+        results[name] = {
+            "ops": ops,
+            "elapsed": elapsed,
+            "throughput": ops / elapsed,
+            "p50": percentile(latencies, 0.5),
+            "p99": percentile(latencies, 0.99),
+            "peak_memory_mib": (tracemalloc.get_traced_memory()[1] - base_memory) / 1024 / 1024,
+            "http_calls": sum(fake.http.calls.values()) - calls_before,
+            "ratelimit_waits": fake.http.ratelimit_waits - waits_before,
+        }
+        r = results[name]
+        print(
+            f"{name:<16} ops={ops:>5}  {r['throughput']:8.1f} ops/s  p50={r['p50'] * 1000:8.1f} ms  "
+            f"p99={r['p99'] * 1000:8.1f} ms  mem={r['peak_memory_mib']:6.2f} MiB  "
+            f"http={r['http_calls']:>5}  rl-waits={r['ratelimit_waits']:>4}"
+        )
+    tracemalloc.stop()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput']:.1f} -> {current['throughput']:.1f} ops/s")
+        if current["p99"] > previous["p99"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {previous['p99'] * 1000:.1f} -> {current['p99'] * 1000:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=50, help="users/tickets/members per scenario")
+    parser.add_argument("--latency", type=float, default=30, help="milliseconds per fake HTTP call")
+    parser.add_argument("--ratelimit-scale", type=float, default=0.05, help="multiplier for rate-limit windows")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="where to write the JSON results")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+    args.out = os.path.join(START_DIR, args.out)
+    if args.baseline:
+        args.baseline = os.path.join(START_DIR, args.baseline)
+
+    results = asyncio.run(run(args))
+    report = {
+        "settings": {"scale": args.scale, "latency_ms": args.latency, "ratelimit_scale": args.ratelimit_scale},
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compares how long the event loop is held up by print(), a plain logging handler and the queued JSON pipeline
+from logs.py, when the output is slow (a busy disk or a terminal nobody reads fast enough).
+
+    python benchmarks/bench_logging.py [records] [write_ms]
+
+Each write to the sink blocks for write_ms. A ticker on the loop measures how late it wakes up while
+records (every tenth one with a traceback) are logged from a handler.
+"""
+import asyncio
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from logs import JsonFormatter, LogQueueHandler
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+WRITE_DELAY = (float(sys.argv[2]) if len(sys.argv) > 2 else 2.0) / 1000
+
+
+class SlowSink:
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, text):
+        time.sleep(WRITE_DELAY)
+        self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+async def measure(name, emit):
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started - 0.001)
+
+    async def handler():
+        started = time.perf_counter()
+        for i in range(RECORDS):
+            if i % 10:
+                emit(i, None)
+            else:
+                try:
+                    raise RuntimeError(f"failure {i}")
+                except RuntimeError as e:
+                    emit(i, e)
+            if i % 20 == 0:
+                await asyncio.sleep(0)
+        return time.perf_counter() - started
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    spent = await handler()
+    done.set()
+    await tick
+    lags.sort()
+    print(
+        f"{name:<16} records={RECORDS:>5}  on loop={spent * 1000:8.1f} ms  "
+        f"loop lag p50={lags[len(lags) // 2] * 1000:7.2f} ms  max={lags[-1] * 1000:8.2f} ms"
+    )
+
+
+def direct_logger(name, sink, handler=None):
+    logger = logging.getLogger(f"bench.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler or logging.StreamHandler(sink)]
+    logger.handlers[0].setFormatter(JsonFormatter())
+    return logger
+
+
+async def main():
+    sink = SlowSink()
+    print(f"each sink write blocks for {WRITE_DELAY * 1000:.1f} ms")
+
+    def emit_print(i, error):
+        print(f"Error handling {i}: {error}" if error else f"handled {i}", file=sink)
+    await measure("print", emit_print)
+
+    direct = direct_logger("direct", sink)
+
+    def emit_direct(i, error):
+        if error:
+            direct.exception("Error handling %s", i)
+        else:
+            direct.info("handled %s", i)
+    await measure("handler", emit_direct)
+
+    records = queue.SimpleQueue()
+    queued = direct_logger("queued", sink, LogQueueHandler(records))
+    writer = logging.StreamHandler(sink)
+    writer.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(records, writer)
+    listener.start()
+
+    def emit_queued(i, error):
+        if error:
+            queued.exception("Error handling %s", i)
+        else:
+            queued.info("handled %s", i)
+    await measure("queued", emit_queued)
+    listener.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Compares the memory profiles from memory.py on a synthetic large guild, without a gateway connection.
+
+    python benchmarks/bench_memory.py [members] [messages]
+
+Each profile runs in its own process so the peak RSS numbers do not leak into each other.
+The stubbed gateway builds the guild from a GUILD_CREATE-shaped payload (voice members only, as
+Discord sends for large guilds), adds every member the way startup chunking would when the
+profile chunks, then pushes MESSAGE_CREATE payloads through the message cache.
+"""
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import discord
+
+from memory import memory_options
+
+PROFILES = ("default", "lean")
+MEMBERS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+MESSAGES = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+VOICE_MEMBERS = 200
+TIMESTAMP = "2024-01-01T00:00:00+00:00"
+
+
+def user_payload(user_id):
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None, "global_name": None}
+
+
+def member_payload(user_id):
+    return {"user": user_payload(user_id), "roles": [], "joined_at": TIMESTAMP, "deaf": False, "mute": False, "flags": 0}
+
+
+def guild_payload():
+    voice_states = [
+        {
+            "user_id": str(user_id), "channel_id": "11", "session_id": "stub", "deaf": False, "mute": False,
+            "self_deaf": False, "self_mute": False, "self_video": False, "suppress": False,
+            "request_to_speak_timestamp": None,
+        }
+        for user_id in range(1, VOICE_MEMBERS + 1)
+    ]
+    return {
+        "id": "1", "name": "Synthetic Lounge", "owner_id": "1", "member_count": MEMBERS, "large": True,
+        "roles": [{"id": "1", "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                   "hoist": False, "managed": False, "mentionable": False}],
+        "channels": [
+            {"id": "10", "type": 0, "name": "general", "position": 0, "permission_overwrites": []},
+            {"id": "11", "type": 2, "name": "voice", "position": 1, "permission_overwrites": [],
+             "bitrate": 64000, "user_limit": 0},
+        ],
+        "voice_states": voice_states,
+        # Large guilds only ship a subset of members in GUILD_CREATE
+        "members": [member_payload(user_id) for user_id in range(1, VOICE_MEMBERS + 1)],
+        "emojis": [], "stickers": [], "features": [],
+    }
+
+
+def message_payload(message_id):
+    author_id = message_id % MEMBERS + 1
+    return {
+        "id": str(10_000_000 + message_id), "channel_id": "10", "guild_id": "1", "author": user_payload(author_id),
+        "content": f"message number {message_id} with some ordinary chat text", "timestamp": TIMESTAMP,
+        "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+        "attachments": [], "embeds": [], "pinned": False, "type": 0,
+    }
+
+
+async def run_profile(profile):
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.message_content = True
+    options = memory_options(profile)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    client = discord.Client(intents=intents, **options)
+    state = client._connection
+    guild = discord.Guild(data=guild_payload(), state=state)
+    state._add_guild(guild)
+
+    # What chunk_guilds_at_startup would pull in
+    if options.get("chunk_guilds_at_startup", True):
+        for user_id in range(1, MEMBERS + 1):
+            guild._add_member(discord.Member(data=member_payload(user_id), guild=guild, state=state))
+
+    channel = guild.get_channel(10)
+    for message_id in range(MESSAGES):
+        message = discord.Message(state=state, channel=channel, data=message_payload(message_id))
+        if state._messages is not None:
+            state._messages.append(message)
+
+    elapsed = time.perf_counter() - started
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    cached_messages = len(state._messages) if state._messages is not None else 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{profile:<8} members cached={len(guild.members):>7}  messages cached={cached_messages:>5}  "
+        f"heap={current / 1024 / 1024:7.2f} MiB  peak RSS={rss:7.1f} MiB  startup={elapsed * 1000:8.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        asyncio.run(run_profile(sys.argv[3]))
+    else:
+        print(f"Synthetic guild: {MEMBERS} members ({VOICE_MEMBERS} in voice), {MESSAGES} messages")
+        for profile in PROFILES:
+            subprocess.run([sys.executable, __file__, str(MEMBERS), str(MESSAGES), profile], check=True)
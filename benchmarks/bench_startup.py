@@ -0,0 +1,62 @@
+"""
+Measures cold start: interpreter launch -> lg imported -> setup_hook finished -> ready, on the fake gateway.
+
+    python benchmarks/bench_startup.py [runs]
+
+Every run is a fresh process so import caches do not carry over (bytecode caches still do).
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+CHILD = """
+import time
+launched = time.perf_counter()
+import asyncio, json, os, sys
+sys.path.insert(0, {root!r})
+sys.path.insert(0, {here!r})
+os.chdir({workdir!r})
+
+import lg
+imported = time.perf_counter()
+
+from fakediscord import FakeDiscord
+
+async def main():
+    fake = FakeDiscord(lg.client, latency=0)
+    await fake.start()
+    setup = time.perf_counter()
+    fake.add_guild(1, members=50)
+    fake.ready()
+    await lg.client.wait_until_ready()
+    ready = time.perf_counter()
+    print(json.dumps({{"import": imported - launched, "setup_hook": setup - imported, "ready": ready - launched}}))
+
+asyncio.run(main())
+"""
+
+
+def run_once():
+    workdir = tempfile.mkdtemp(prefix="lifegiver-startup-")
+    code = CHILD.format(root=ROOT, here=HERE, workdir=workdir)
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - started
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process"] = total
+    return timings
+
+
+if __name__ == "__main__":
+    runs = [run_once() for _ in range(RUNS)]
+    for key in ("import", "setup_hook", "ready", "process"):
+        values = [run[key] * 1000 for run in runs]
+        print(f"{key:<11} median={statistics.median(values):8.1f} ms  min={min(values):8.1f} ms  max={max(values):8.1f} ms")
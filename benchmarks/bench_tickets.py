@@ -0,0 +1,70 @@
+"""
+Hammers TicketView.create_ticket with concurrent clicks against the fake Discord layer.
+
+    python benchmarks/bench_tickets.py [clicks] [users] [latency_ms]
+
+By default 100 clicks come from 50 users (everyone double-clicks). Reports how long each click took
+to get its first response (the defer, which must land inside Discord's 3 second window) and its
+final followup, and checks that every user ended up with exactly one ticket channel.
+Rate limits are off here; bench_handlers.py covers them.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# The bot keeps its SQLite state in the working directory
+os.chdir(tempfile.mkdtemp(prefix="lifegiver-bench-"))
+
+import discord
+
+import lg
+from fakediscord import FakeDiscord
+
+CLICKS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+USERS = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+LATENCY = (int(sys.argv[3]) if len(sys.argv) > 3 else 80) / 1000
+
+
+def p99(values):
+    return values[min(int(len(values) * 0.99), len(values) - 1)]
+
+
+async def main():
+    fake = FakeDiscord(lg.client, latency=LATENCY, rate_limits={})
+    await fake.start()
+    guild = fake.add_guild(1, members=USERS)
+    fake.ready()
+
+    button = lg.client.extensions["cogs.tickets"].TicketView().children[0]
+    clicks = [fake.interaction(guild, guild.get_member(i % USERS + 1)) for i in range(CLICKS)]
+
+    async def click(interaction):
+        await button.callback(interaction)
+        interaction.finished_at = time.perf_counter()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(click(interaction) for interaction in clicks))
+    elapsed = time.perf_counter() - started
+
+    first = sorted(interaction.responded_at - started for interaction in clicks)
+    final = sorted(interaction.finished_at - started for interaction in clicks)
+    channels = [c for c in fake.http.channels.values() if c["type"] == discord.ChannelType.text.value and c.get("parent_id")]
+    opened = sum(1 for interaction in clicks if "has been opened" in interaction.replies[-1])
+
+    print(f"{CLICKS} clicks from {USERS} users, {LATENCY * 1000:.0f} ms per mocked HTTP call")
+    print(f"  first response  p50={statistics.median(first) * 1000:7.1f} ms  p99={p99(first) * 1000:7.1f} ms")
+    print(f"  final response  p50={statistics.median(final) * 1000:7.1f} ms  p99={p99(final) * 1000:7.1f} ms")
+    print(f"  total {elapsed:.2f}s, {sum(fake.http.calls.values())} HTTP calls, {len(channels)} ticket channels, "
+          f"{opened} 'opened' replies, {CLICKS - opened} 'already open' replies")
+    if len(channels) != USERS:
+        print(f"  !! expected {USERS} ticket channels")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+"""
+Compares the old one-task-per-member disconnect timers with the single-heap DisconnectScheduler.
+
+    python benchmarks/bench_timers.py [count]
+
+Reports peak memory while the timers are pending, how late each timer fired, and what scheduling and
+cancelling one timer costs. The scheduler writes to a temporary file database, as in production. Its
+schedule/cancel only queue the SQLite write; what the commit costs when every loop iteration flushes a
+single change (the worst case) is reported separately.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from timers import DisconnectScheduler
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+DELAY = 2.0  # every timer is due within this many seconds after the last one is armed
+SAMPLE = max(COUNT // 10, 1)  # timers used to measure schedule and cancel cost
+
+
+class FakeMember:
+    def __init__(self, member_id):
+        self.id = member_id
+        self.name = f"member-{member_id}"
+
+
+def per_call_us(started, calls):
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def report(name, memory, lateness, schedule_us, cancel_us):
+    lateness = sorted(lateness)
+    p99 = lateness[int(len(lateness) * 0.99) - 1]
+    print(
+        f"{name:<16} timers={len(lateness):>6}  mem={memory / 1024 / 1024:7.2f} MiB  "
+        f"late p50={statistics.median(lateness) * 1000:7.2f} ms  p99={p99 * 1000:7.2f} ms  "
+        f"schedule={schedule_us:8.2f} us  cancel={cancel_us:8.2f} us"
+    )
+
+
+async def bench_tasks():
+    # Mirrors the old /disconnect: one sleeping task per member, closing over the member object
+    tasks = {}
+    lateness = []
+
+    def start(member, deadline):
+        async def perform_disconnect():
+            try:
+                await asyncio.sleep(deadline - time.time())
+                lateness.append(time.time() - deadline)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                if tasks.get(member.id) is task:
+                    del tasks[member.id]
+        task = tasks[member.id] = asyncio.create_task(perform_disconnect())
+
+    # Cost of arming and cancelling one timer, on timers far in the future
+    started = time.perf_counter()
+    for i in range(SAMPLE):
+        start(FakeMember(i), time.time() + 3600)
+    schedule_us = per_call_us(started, SAMPLE)
+    started = time.perf_counter()
+    for i in range(SAMPLE):
+        tasks.pop(i).cancel()
+    cancel_us = per_call_us(started, SAMPLE)
+    await asyncio.sleep(0)
+
+    # Deadlines start after arming is expected to finish, so lateness only measures firing
+    tracemalloc.start()
+    base = time.time() + COUNT * schedule_us / 1_000_000 * 3 + DELAY / 2
+    for i in range(COUNT):
+        start(FakeMember(i), base + (i % 1000) / 1000 * DELAY / 2)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    while tasks:
+        await asyncio.sleep(0.05)
+    report("task-per-timer", memory, lateness, schedule_us, cancel_us)
+
+
+async def bench_scheduler(path):
+    lateness = []
+    deadlines = {}
+
+    async def on_fire(batch):
+        now = time.time()
+        for guild_id, member_id, channel_id in batch:
+            lateness.append(now - deadlines[member_id])
+
+    scheduler = DisconnectScheduler(path, on_fire=on_fire)
+
+    # Cost of arming and cancelling one timer, on timers far in the future
+    started = time.perf_counter()
+    for i in range(SAMPLE):
+        scheduler.schedule(1, i, 1, time.time() + 3600)
+    schedule_us = per_call_us(started, SAMPLE)
+    started = time.perf_counter()
+    for i in range(SAMPLE):
+        scheduler.cancel(1, i)
+    cancel_us = per_call_us(started, SAMPLE)
+    await asyncio.sleep(0)
+
+    # Cost of the write-behind commit when it only carries one change
+    started = time.perf_counter()
+    for i in range(SAMPLE):
+        scheduler.schedule(1, i, 1, time.time() + 3600)
+        scheduler.flush()
+        scheduler.cancel(1, i)
+        scheduler.flush()
+    flush_us = per_call_us(started, SAMPLE * 2)
+
+    tracemalloc.start()
+    base = time.time() + COUNT * schedule_us / 1_000_000 * 3 + DELAY / 2
+    for i in range(COUNT):
+        deadlines[i] = base + (i % 1000) / 1000 * DELAY / 2
+        scheduler.schedule(1, i, 1, deadlines[i])
+    # Let the queued writes be committed, as they would be right after the command that armed them
+    await asyncio.sleep(0)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    loop = asyncio.create_task(scheduler.run())
+    while len(lateness) < COUNT:
+        await asyncio.sleep(0.05)
+    loop.cancel()
+    scheduler.db.close()
+    report("heap scheduler", memory, lateness, schedule_us, cancel_us)
+    print(f"{'':<16} commit of a single change: {flush_us:8.2f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(bench_tasks())
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(bench_scheduler(os.path.join(directory, "timers.db")))
@@ -0,0 +1,368 @@
+"""
+In-memory stand-in for Discord, used by the benchmarks to drive lg.py without a gateway connection.
+
+Real discord.py models (Guild, TextChannel, Member, Message, ...) are built from gateway-shaped payloads,
+and the bot's HTTPClient is swapped for FakeHTTP, which keeps channels and messages in memory, charges a
+configurable latency per call and enforces per-route rate-limit buckets like Discord does. Changes that
+Discord would announce over the gateway (channel create/delete, voice state updates) are fed back into
+the client's cache the same way.
+"""
+import asyncio
+import collections
+import datetime
+import itertools
+import time
+
+import discord
+
+BOT_ID = 999
+EPOCH_PAYLOAD = "2024-01-01T00:00:00+00:00"
+
+# (requests, per seconds) for each bucket, keyed by the major parameter like the real buckets.
+# Roughly what Discord hands out to a bot today.
+DEFAULT_RATE_LIMITS = {
+    "send_message": (5, 5.0),
+    "delete_message": (5, 1.0),
+    "delete_messages": (1, 1.0),
+    "create_channel": (5, 5.0),
+    "delete_channel": (5, 5.0),
+    "edit_channel": (2, 10.0),
+    "edit_member": (10, 10.0),
+    "logs_from": (5, 5.0),
+    "get_channel": (5, 5.0),
+}
+
+
+def user_payload(user_id, bot=False):
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None,
+            "global_name": None, "bot": bot}
+
+
+def member_payload(user_id, roles=(), bot=False):
+    return {"user": user_payload(user_id, bot=bot), "roles": [str(role) for role in roles], "joined_at": EPOCH_PAYLOAD,
+            "deaf": False, "mute": False, "flags": 0}
+
+
+def voice_state_payload(guild_id, user_id, channel_id):
+    return {"guild_id": str(guild_id), "user_id": str(user_id), "channel_id": channel_id and str(channel_id),
+            "session_id": "fake", "deaf": False, "mute": False, "self_deaf": False, "self_mute": False,
+            "self_video": False, "suppress": False, "request_to_speak_timestamp": None}
+
+
+class FakeResponse:
+    """
+    Enough of an aiohttp response for discord.HTTPException.
+    """
+    def __init__(self, status, reason):
+        self.status = status
+        self.reason = reason
+
+
+class Bucket:
+    def __init__(self, limit, per):
+        self.limit = limit
+        self.per = per
+        self.window_start = 0.0
+        self.used = 0
+
+
+class FakeHTTP:
+    """
+    Replaces discord.http.HTTPClient for the REST calls lg.py makes.
+    """
+    def __init__(self, state, latency=0.05, rate_limits=None):
+        self.state = state
+        self.latency = latency
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.channels = {}                                 # channel_id -> payload
+        self.messages = collections.defaultdict(dict)      # channel_id -> {message_id: payload}
+        self.calls = collections.Counter()
+        self.ratelimit_waits = 0
+        self.ratelimit_wait_time = 0.0
+        self._buckets = {}
+        self._ids = itertools.count(1)
+
+    # --------------------------------------------------------------------------
+    # Plumbing
+    # --------------------------------------------------------------------------
+    def snowflake(self, age=0.0):
+        """
+        A unique id whose embedded timestamp is `age` seconds in the past.
+        """
+        moment = discord.utils.utcnow() - datetime.timedelta(seconds=age)
+        return discord.utils.time_snowflake(moment) + next(self._ids) % 4096
+
+    async def _call(self, route, major=None):
+        self.calls[route] += 1
+        limit = self.rate_limits.get(route)
+        if limit:
+            bucket = self._buckets.get((route, major))
+            if bucket is None:
+                bucket = self._buckets[(route, major)] = Bucket(*limit)
+            while True:
+                now = time.monotonic()
+                if now - bucket.window_start >= bucket.per:
+                    bucket.window_start = now
+                    bucket.used = 0
+                if bucket.used < bucket.limit:
+                    bucket.used += 1
+                    break
+                wait = bucket.window_start + bucket.per - now
+                self.ratelimit_waits += 1
+                self.ratelimit_wait_time += wait
+                await asyncio.sleep(wait)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _gateway(self, callback, data):
+        # Gateway events trail the REST response slightly
+        asyncio.get_running_loop().call_later(0.002, callback, data)
+
+    def _not_found(self, what):
+        return discord.NotFound(FakeResponse(404, "Not Found"), f"Unknown {what}")
+
+    # --------------------------------------------------------------------------
+    # Channels
+    # --------------------------------------------------------------------------
+    def add_channel(self, payload):
+        self.channels[int(payload["id"])] = payload
+        return payload
+
+    async def create_channel(self, guild_id, channel_type, *, reason=None, **options):
+        await self._call("create_channel", guild_id)
+        data = self.add_channel({
+            "id": str(self.snowflake()), "type": channel_type, "guild_id": str(guild_id), "name": options.get("name"),
+            "parent_id": options.get("parent_id") and str(options["parent_id"]), "position": len(self.channels),
+            "permission_overwrites": [
+                {"id": str(o["id"]), "type": o["type"], "allow": str(o["allow"]), "deny": str(o["deny"])}
+                for o in options.get("permission_overwrites", [])
+            ],
+        })
+        self._gateway(self.state.parse_channel_create, data)
+        return data
+
+    async def get_channel(self, channel_id):
+        await self._call("get_channel", channel_id)
+        if int(channel_id) not in self.channels:
+            raise self._not_found("Channel")
+        return self.channels[int(channel_id)]
+
+    async def edit_channel(self, channel_id, *, reason=None, **options):
+        await self._call("edit_channel", channel_id)
+        data = self.channels[int(channel_id)]
+        if "parent_id" in options:
+            data["parent_id"] = options["parent_id"] and str(options["parent_id"])
+        if "name" in options:
+            data["name"] = options["name"]
+        self._gateway(self.state.parse_channel_update, data)
+        return data
+
+    async def delete_channel(self, channel_id, *, reason=None):
+        await self._call("delete_channel", channel_id)
+        data = self.channels.pop(int(channel_id), None)
+        if data is None:
+            raise self._not_found("Channel")
+        self.messages.pop(int(channel_id), None)
+        self._gateway(self.state.parse_channel_delete, data)
+
+    # --------------------------------------------------------------------------
+    # Messages
+    # --------------------------------------------------------------------------
+    def add_message(self, channel_id, author_id, content, age=0.0, bot=False):
+        """
+        Seeds history without going through the rate limiter.
+        """
+        message_id = self.snowflake(age)
+        payload = {
+            "id": str(message_id), "channel_id": str(channel_id), "author": user_payload(author_id, bot=bot),
+            "content": content, "timestamp": discord.utils.snowflake_time(message_id).isoformat(),
+            "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [],
+            "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "type": 0,
+        }
+        self.messages[int(channel_id)][message_id] = payload
+        return payload
+
+    async def send_message(self, channel_id, *, params):
+        await self._call("send_message", channel_id)
+        payload = params.payload or {}
+        data = self.add_message(channel_id, BOT_ID, payload.get("content") or "", bot=True)
+        data["embeds"] = payload.get("embeds", [])
+        return data
+
+    async def logs_from(self, channel_id, limit, before=None, after=None, around=None):
+        await self._call("logs_from", channel_id)
+        ids = sorted(self.messages.get(int(channel_id), {}))
+        if before is not None:
+            ids = [i for i in ids if i < int(before)][-limit:]
+        elif after is not None:
+            ids = [i for i in ids if i > int(after)][:limit]
+        else:
+            ids = ids[-limit:]
+        # Discord always answers newest first
+        return [self.messages[int(channel_id)][i] for i in reversed(ids)]
+
+    async def delete_message(self, channel_id, message_id, *, reason=None):
+        await self._call("delete_message", channel_id)
+        if self.messages[int(channel_id)].pop(int(message_id), None) is None:
+            raise self._not_found("Message")
+
+    async def delete_messages(self, channel_id, message_ids, *, reason=None):
+        await self._call("delete_messages", channel_id)
+        cutoff = discord.utils.utcnow() - datetime.timedelta(days=14)
+        if any(discord.utils.snowflake_time(int(i)) < cutoff for i in message_ids):
+            raise discord.HTTPException(FakeResponse(400, "Bad Request"), "Messages older than 14 days")
+        for message_id in message_ids:
+            self.messages[int(channel_id)].pop(int(message_id), None)
+
+    # --------------------------------------------------------------------------
+    # Members
+    # --------------------------------------------------------------------------
+    async def edit_member(self, guild_id, user_id, *, reason=None, **fields):
+        await self._call("edit_member", guild_id)
+        if "channel_id" in fields:
+            self._gateway(self.state.parse_voice_state_update, voice_state_payload(guild_id, user_id, fields["channel_id"]))
+        return dict(member_payload(user_id), guild_id=str(guild_id))
+
+
+class FakeGateway:
+    """
+    The bits of DiscordWebSocket the bot touches outside of login.
+    """
+    def __init__(self):
+        self.latency = 0.042
+        self.presence_updates = 0
+
+    async def change_presence(self, *, activity=None, status=None, since=0.0):
+        self.presence_updates += 1
+
+    def is_ratelimited(self):
+        return False
+
+
+class FakeSentMessage:
+    def __init__(self, http, content):
+        self.http = http
+        self.content = content
+        self.edits = 0
+
+    async def edit(self, content=None, **kwargs):
+        await asyncio.sleep(self.http.latency)
+        self.content = content
+        self.edits += 1
+        return self
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def _respond(self, content):
+        if self._done:
+            raise discord.InteractionResponded(self.interaction)
+        self._done = True
+        await asyncio.sleep(self.interaction.http.latency)
+        self.interaction.responded_at = time.perf_counter()
+        if content is not None:
+            self.interaction.replies.append(content)
+
+    async def defer(self, **kwargs):
+        await self._respond(None)
+
+    async def send_message(self, content=None, **kwargs):
+        await self._respond(content)
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, *, wait=False, **kwargs):
+        await asyncio.sleep(self.interaction.http.latency)
+        self.interaction.replies.append(content)
+        return FakeSentMessage(self.interaction.http, content) if wait else None
+
+
+class FakeInteraction:
+    """
+    Duck-types discord.Interaction for command and view callbacks.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, http, guild, user, channel=None):
+        self.id = next(self._ids)
+        self.http = http
+        self.guild = guild
+        self.user = user
+        self.channel = channel
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+        self.replies = []
+        self.responded_at = None
+
+
+class FakeDiscord:
+    """
+    Attaches to a discord.py client without logging in and builds guilds for it to serve.
+    """
+    def __init__(self, client, latency=0.05, rate_limits=None):
+        self.client = client
+        self.state = client._connection
+        self.http = FakeHTTP(self.state, latency=latency, rate_limits=rate_limits)
+        self.gateway = FakeGateway()
+
+    async def start(self):
+        """
+        Binds the client to the running loop the way login() would, then runs setup_hook.
+        Call ready() once the guilds are built.
+        """
+        await self.client._async_setup_hook()
+        self.state.user = discord.ClientUser(state=self.state, data=user_payload(BOT_ID, bot=True))
+        self.client.ws = self.gateway
+        await self.client.setup_hook()
+        # Swapped in after setup_hook, which wraps the real HTTPClient for metrics
+        self.state.http = self.client.http = self.http
+
+    def ready(self):
+        self.client._ready.set()
+
+    def add_guild(self, guild_id, members=100, voice_members=0, admin_id=1, text_channels=("general",)):
+        """
+        Builds a guild with `members` members (ids 1..members), `admin_id` as owner, a voice channel holding
+        the first `voice_members` members, and the given text channels. The first one is the system channel.
+        """
+        channels = []
+        for name in text_channels:
+            channels.append(self.http.add_channel({
+                "id": str(self.http.snowflake()), "type": 0, "guild_id": str(guild_id), "name": name,
+                "position": len(channels), "permission_overwrites": [],
+            }))
+        voice = self.http.add_channel({
+            "id": str(self.http.snowflake()), "type": 2, "guild_id": str(guild_id), "name": "Lounge Voice",
+            "position": len(channels), "permission_overwrites": [], "bitrate": 64000, "user_limit": 0,
+        })
+        data = {
+            "id": str(guild_id), "name": f"Fake Lounge {guild_id}", "owner_id": str(admin_id),
+            "member_count": members + 1, "system_channel_id": channels[0]["id"] if channels else None,
+            "roles": [{"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                       "hoist": False, "managed": False, "mentionable": False}],
+            "channels": channels + [voice],
+            "voice_states": [voice_state_payload(guild_id, user_id, voice["id"]) for user_id in range(1, voice_members + 1)],
+            "members": [member_payload(user_id) for user_id in range(1, members + 1)] + [member_payload(BOT_ID, bot=True)],
+            "emojis": [], "stickers": [], "features": [],
+        }
+        guild = discord.Guild(data=data, state=self.state)
+        self.state._add_guild(guild)
+        return guild
+
+    def interaction(self, guild, user, channel=None):
+        return FakeInteraction(self.http, guild, user, channel)
+
+    def join(self, guild, user_id):
+        """
+        Simulates GUILD_MEMBER_ADD.
+        """
+        self.state.parse_guild_member_add(dict(member_payload(user_id), guild_id=str(guild.id)))
@@ -0,0 +1,104 @@
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import command_sync, metrics
+from outbound import PRIORITIES
+from sync import tree_hash
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# GENERAL COMMANDS
+# ==============================================================================
+
+class General(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        # Commands may be overwritten or gone when the bot is re-invited, so the next !sync must push them
+        command_sync.forget(guild.id)
+
+    @commands.command(name="sync")
+    @metrics.traced("!sync")
+    async def sync(self, ctx, mode: str = None):
+        try:
+            tree = ctx.bot.tree
+            tree.copy_global_to(guild=ctx.guild)
+            # Only hit Discord's sync endpoint when the commands differ from what this guild last got
+            digest = tree_hash(tree, ctx.guild)
+            if mode != "force" and command_sync.is_current(ctx.guild.id, digest):
+                metrics.inc("sync.skipped")
+                return await ctx.send("✅ **Commands are already up to date** on this server. Use `!sync force` to push them anyway.")
+            fmt = await tree.sync(guild=ctx.guild)
+            command_sync.mark_synced(ctx.guild.id, digest)
+            await ctx.message.delete()
+            await ctx.send(f"✅ **Synced {len(fmt)} commands** to this server! You should see them now.")
+        except Exception as e:
+            log.exception("Failed to sync commands to %s", ctx.guild.name, extra={"guild_id": ctx.guild.id})
+            await ctx.send(f"❌ Failed to sync: {e}")
+
+    @commands.command(name="ping")
+    @metrics.traced("!ping")
+    async def ping(self, ctx):
+        latency = round(self.bot.latency * 1000)
+        report = self.bot.shard_report()
+        if len(report) == 1:
+            return await ctx.send(f"🏓 **Pong!** Connection latency is {latency}ms.")
+
+        slowest = max(report, key=lambda shard: shard[1])[0]
+        lines = [f"🏓 **Pong!** Average latency is {latency}ms across {len(report)} shards."]
+        for shard_id, shard_latency, guilds, events in report:
+            marker = " 🐢" if shard_id == slowest else ""
+            lines.append(f"`Shard {shard_id}`: {shard_latency * 1000:.0f}ms, {guilds} guilds, {events} events/min{marker}")
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name="avatar")
+    @metrics.traced("!avatar")
+    async def avatar(self, ctx, member: discord.Member = None):
+        member = member or ctx.author
+        embed = discord.Embed(title=f"{member.name}'s Avatar", color=discord.Color.purple())
+        embed.set_image(url=member.display_avatar.url)
+        await ctx.send(embed=embed)
+
+    @app_commands.command(name="stats", description="Show command timings, error counts and rate-limit waits.")
+    @metrics.traced("stats")
+    async def stats(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            return await interaction.response.send_message("Admins only.", ephemeral=True)
+
+        snapshot = metrics.snapshot()
+        lines = []
+        # Whole handlers first, then their steps and HTTP routes, slowest p99 first
+        for name, timing in sorted(snapshot["timings"].items(), key=lambda item: ("." in item[0] or item[0].startswith("http"), -item[1]["p99"])):
+            errors = snapshot["counters"].get(f"{name}.errors", 0)
+            lines.append(
+                f"`{name}` ×{timing['count']}: p50 {timing['p50'] * 1000:.0f}ms, p99 {timing['p99'] * 1000:.0f}ms"
+                + (f", **{errors} errors**" if errors else "")
+            )
+        # Bucket waits are discord.py pacing requests before sending; 429 retries are the ones Discord rejected
+        bucket = snapshot["timings"].get("ratelimit.bucket_wait")
+        retried = snapshot["timings"].get("ratelimit.wait")
+        waited = "\n".join([
+            f"bucket waits: {bucket['count']}, {bucket['total']:.1f}s total" if bucket else "bucket waits: none",
+            f"429 retries: {retried['count']}, {retried['total']:.1f}s total" if retried else "429 retries: none",
+        ])
+
+        embed = discord.Embed(title="📊 Life Giver Stats", description="\n".join(lines[:25]) or "No data yet.", color=discord.Color.blurple())
+        embed.add_field(name="Rate limits", value=waited)
+        gauges, counters = snapshot["gauges"], snapshot["counters"]
+        queued = ", ".join(f"{priority} {gauges.get(f'outbound.pending.{priority}', 0)}" for priority in PRIORITIES)
+        embed.add_field(
+            name="Outbound queue",
+            value=f"{queued} · {counters.get('outbound.coalesced', 0)} coalesced, {counters.get('outbound.dropped', 0)} dropped"
+        )
+        embed.add_field(name="Joins (last minute)", value=str(gauges.get(f"welcome.join_rate.{interaction.guild.id}", 0)))
+        embed.add_field(name="Uptime", value=f"{snapshot['uptime'] / 3600:.1f}h")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(General(bot))
@@ -0,0 +1,52 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from config import CLEAN_MAX_AMOUNT
+from core import metrics
+from purge import build_check, purge_messages
+
+# ==============================================================================
+# MODERATION
+# ==============================================================================
+
+class Moderation(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(name="say")
+    @metrics.traced("!say")
+    async def say(self, ctx, *, message):
+        if ctx.author.guild_permissions.administrator:
+            await ctx.message.delete()
+            await ctx.send(message)
+        else:
+            await ctx.send("❌ You need Administration permission for this.", delete_after=5)
+
+    @app_commands.command(name="clean", description="Cleans messages from the chat.")
+    @app_commands.describe(
+        amount="Number of messages to search through",
+        member="Only delete messages from this member",
+        contains="Only delete messages containing this text",
+        bots_only="Only delete messages sent by bots"
+    )
+    @metrics.traced("clean")
+    async def clean(self, interaction: discord.Interaction, amount: app_commands.Range[int, 1, CLEAN_MAX_AMOUNT],
+                    member: discord.Member = None, contains: str = None, bots_only: bool = False):
+        if not interaction.user.guild_permissions.manage_messages:
+            return await interaction.response.send_message("You cannot manage messages.", ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True)
+        progress = await interaction.followup.send(f"🧹 Sweeping up to {amount} messages...", ephemeral=True, wait=True)
+
+        async def on_progress(stats):
+            await progress.edit(content=f"🧹 Sweeping... {stats}.")
+
+        check = build_check(author=member, contains=contains, bots_only=bots_only)
+        stats = await purge_messages(interaction.channel, amount, check=check, on_progress=on_progress)
+        metrics.inc("clean.deleted", stats.deleted)
+        metrics.inc("clean.failed", stats.failed)
+        await progress.edit(content=f"🧹 Swept away {stats.deleted} messages ({stats}).")
+
+async def setup(bot):
+    await bot.add_cog(Moderation(bot))
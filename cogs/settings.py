@@ -0,0 +1,100 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import guild_config, metrics
+from guildconfig import MAX_LENGTH, validate
+
+# ==============================================================================
+# SERVER SETTINGS
+# ==============================================================================
+
+TEXT_SETTINGS = [app_commands.Choice(name=key, value=key) for key in MAX_LENGTH]
+ALL_SETTINGS = [
+    app_commands.Choice(name="support_role_id", value="support_role_id"),
+    app_commands.Choice(name="alert_channel_id", value="alert_channel_id"),
+] + TEXT_SETTINGS
+
+class Settings(commands.Cog):
+    config_group = app_commands.Group(name="config", description="View or change Life Giver's settings for this server.", guild_only=True)
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @config_group.command(name="show", description="Show this server's settings.")
+    @metrics.traced("config.show")
+    async def show(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            return await interaction.response.send_message("Admins only.", ephemeral=True)
+
+        guild = interaction.guild
+        embed = discord.Embed(title="⚙️ Life Giver Settings", color=discord.Color.blurple())
+        for key, value in guild_config.all(guild.id).items():
+            if key == "support_role_id":
+                role = guild.get_role(value) if value else None
+                value = role.mention if role else ("none" if not value else f"`{value}` (role not found)")
+            elif key == "alert_channel_id":
+                channel = guild.get_channel(value) if value else None
+                value = channel.mention if channel else ("moderator updates channel" if not value else f"`{value}` (channel not found)")
+            else:
+                # Embed fields hold at most 1024 characters
+                value = f"`{value[:1000]}`" + ("…" if len(value) > 1000 else "")
+            marker = "" if guild_config.is_default(guild.id, key) else " ✏️"
+            embed.add_field(name=f"{key}{marker}", value=value, inline=False)
+        embed.set_footer(text="✏️ = changed on this server. Use /config set, /config support_role, /config alert_channel or /config reset.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @config_group.command(name="set", description="Change a text setting (category names, welcome text).")
+    @app_commands.describe(key="Setting to change", value="New value")
+    @app_commands.choices(key=TEXT_SETTINGS)
+    @metrics.traced("config.set")
+    async def set(self, interaction: discord.Interaction, key: app_commands.Choice[str], value: str):
+        if not interaction.user.guild_permissions.administrator:
+            return await interaction.response.send_message("Admins only.", ephemeral=True)
+        try:
+            value = validate(key.value, value)
+        except ValueError as e:
+            return await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+
+        guild_config.set(interaction.guild.id, key.value, value)
+        await interaction.response.send_message(f"✅ **{key.value}** is now `{value}`.", ephemeral=True)
+
+    @config_group.command(name="support_role", description="Set the role pinged on new tickets (leave empty for none).")
+    @app_commands.describe(role="Support role")
+    @metrics.traced("config.support_role")
+    async def support_role(self, interaction: discord.Interaction, role: discord.Role = None):
+        if not interaction.user.guild_permissions.administrator:
+            return await interaction.response.send_message("Admins only.", ephemeral=True)
+
+        guild_config.set(interaction.guild.id, "support_role_id", role.id if role else 0)
+        if role:
+            await interaction.response.send_message(f"✅ New tickets will ping {role.mention}.", ephemeral=True)
+        else:
+            await interaction.response.send_message("✅ New tickets will not ping a support role.", ephemeral=True)
+
+    @config_group.command(name="alert_channel", description="Set where raid alerts go (leave empty for the moderator updates channel).")
+    @app_commands.describe(channel="Alert channel")
+    @metrics.traced("config.alert_channel")
+    async def alert_channel(self, interaction: discord.Interaction, channel: discord.TextChannel = None):
+        if not interaction.user.guild_permissions.administrator:
+            return await interaction.response.send_message("Admins only.", ephemeral=True)
+
+        guild_config.set(interaction.guild.id, "alert_channel_id", channel.id if channel else 0)
+        if channel:
+            await interaction.response.send_message(f"✅ Raid alerts will be posted in {channel.mention}.", ephemeral=True)
+        else:
+            await interaction.response.send_message("✅ Raid alerts will go to the moderator updates channel, if the server has one.", ephemeral=True)
+
+    @config_group.command(name="reset", description="Put a setting back to its default.")
+    @app_commands.describe(key="Setting to reset")
+    @app_commands.choices(key=ALL_SETTINGS)
+    @metrics.traced("config.reset")
+    async def reset(self, interaction: discord.Interaction, key: app_commands.Choice[str]):
+        if not interaction.user.guild_permissions.administrator:
+            return await interaction.response.send_message("Admins only.", ephemeral=True)
+
+        guild_config.reset(interaction.guild.id, key.value)
+        await interaction.response.send_message(f"✅ **{key.value}** is back to its default.", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Settings(bot))
@@ -0,0 +1,458 @@
+import asyncio
+import logging
+import os
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from config import (
+    DELETE_CLOSED_TICKETS, STALE_SWEEP_BATCH, STALE_SWEEP_INTERVAL, STALE_SWEEP_PAUSE, STALE_TICKET_AFTER,
+    STALE_TICKET_GRACE, TRANSCRIPT_ATTACHMENT_MAX_BYTES, TRANSCRIPT_DIR,
+)
+from analytics import format_duration
+from core import guild_config, metrics, outbound, resources, ticket_analytics, ticket_store
+from outbound import HIGH, NORMAL
+from tickets import export_transcript
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# TICKET SYSTEM
+# ==============================================================================
+
+# channel_id -> task archiving that ticket, so a double click or the stale sweeper never archives it twice
+archiving_tickets = {}
+
+async def archive_ticket(channel, closed_by=None):
+    """
+    Close pipeline: export the transcript, mark the ticket closed in the index, then delete the channel
+    (or move it into the closed category when DELETE_CLOSED_TICKETS is off).
+    closed_by is the member id credited with the close in the ticket stats, if any.
+    Returns the number of messages archived, or None if the ticket is already closed or being archived.
+    """
+    ticket = ticket_store.get_by_channel(channel.id)
+    if channel.id in archiving_tickets or (ticket and ticket["state"] == "closed"):
+        metrics.inc("close_ticket.deduplicated")
+        return None
+    task = archiving_tickets[channel.id] = asyncio.create_task(run_archive(channel, ticket, closed_by))
+    task.add_done_callback(lambda task: archiving_tickets.pop(channel.id, None))
+    return await task
+
+async def run_archive(channel, ticket, closed_by):
+    guild = channel.guild
+    path = os.path.join(TRANSCRIPT_DIR, str(guild.id), f"{channel.name}-{channel.id}.jsonl.gz")
+
+    # 1. Export the transcript, with local copies of the attachments
+    with metrics.timer("close_ticket.transcript"):
+        count = await export_transcript(
+            channel, path,
+            attachment_dir=path[:-len(".jsonl.gz")] if TRANSCRIPT_ATTACHMENT_MAX_BYTES else None,
+            max_attachment_bytes=TRANSCRIPT_ATTACHMENT_MAX_BYTES
+        )
+    ticket_store.close(channel.id, path)
+    ticket_analytics.closed(guild.id, channel.id, ticket["number"] if ticket else None, closed_by)
+    metrics.inc("close_ticket.transcript_messages", count)
+
+    # 2. Delete the channel, or move it and sync permissions
+    if DELETE_CLOSED_TICKETS:
+        with metrics.timer("close_ticket.channel_delete"):
+            await channel.delete(reason=f"Ticket archived ({count} messages)")
+        return count
+
+    # Created privately if it does not exist yet
+    with metrics.timer("close_ticket.category"):
+        closed_category = await resources.ensure_category(
+            guild, guild_config.get(guild.id, "closed_category"), overwrites=resources.closed_overwrites(guild)
+        )
+    with metrics.timer("close_ticket.channel_move"):
+        await channel.edit(category=closed_category, sync_permissions=True)
+
+    # 3. Notify inside the channel
+    embed = discord.Embed(description=f"🔒 **Ticket Closed and Archived.** Transcript saved ({count} messages).", color=discord.Color.red())
+    with metrics.timer("close_ticket.message_send"):
+        await outbound.send(channel, embed=embed, priority=NORMAL, coalesce=("archived", channel.id))
+    return count
+
+async def open_ticket(guild, user):
+    """
+    Returns (channel, number, created). Reuses the user's open ticket if it still exists.
+    """
+    existing = ticket_store.open_ticket_for(guild.id, user.id)
+    if existing:
+        channel = guild.get_channel(existing["channel_id"])
+        if channel is None:
+            # Not cached yet (the gateway event can trail the create call) or deleted by hand
+            try:
+                channel = await guild.fetch_channel(existing["channel_id"])
+            except discord.NotFound:
+                channel = None
+        if channel:
+            return channel, existing["number"], False
+        ticket_store.close(existing["channel_id"])
+        ticket_analytics.closed(guild.id, existing["channel_id"], existing["number"])
+
+    # 1. Get or Create Category
+    with metrics.timer("create_ticket.category"):
+        category = await resources.ensure_category(guild, guild_config.get(guild.id, "ticket_category"))
+
+    # 2. Determine Channel Name
+    with metrics.timer("create_ticket.allocate"):
+        next_num = ticket_store.allocate(guild.id)
+    channel_name = f"ticket-{next_num:04d}"
+
+    # 3. Set Permissions
+    overwrites = resources.ticket_overwrites(guild, user)
+
+    # 4. Create Channel
+    with metrics.timer("create_ticket.channel_create"):
+        ticket_channel = await guild.create_text_channel(name=channel_name, category=category, overwrites=overwrites)
+    ticket_store.open(guild.id, next_num, ticket_channel.id, user.id)
+    ticket_analytics.opened(guild.id, ticket_channel.id, next_num, user.id)
+    return ticket_channel, next_num, True
+
+async def post_ticket_menu(ticket_channel, user, number):
+    support_role = resources.support_role(ticket_channel.guild)
+    support_role_mention = support_role.mention if support_role else ""
+    embed = discord.Embed(
+        title=f"Life Support #{number:04d}",
+        description="Please describe your issue. Support will be with you shortly.",
+        color=discord.Color.green()
+    )
+
+    content_msg = f"{user.mention} {support_role_mention}".strip()
+
+    # Wrapped in try/except to catch errors if the message fails to send
+    try:
+        with metrics.timer("create_ticket.message_send"):
+            await outbound.send(ticket_channel, content=content_msg, embed=embed, view=CloseTicketView(), priority=HIGH)
+    except Exception as e:
+        log.exception("Failed to send the ticket menu in %s", ticket_channel.name, extra={"channel_id": ticket_channel.id})
+        await outbound.send(ticket_channel, content=f"Ticket created, but I couldn't load the menu. Error: {e}", priority=HIGH)
+
+def stale_action(ticket, channel, now):
+    """
+    What the sweeper should do with an open ticket: "warn", "close", "clear" (someone replied
+    after the warning) or None. Activity comes from the cached last_message_id, never from history.
+    """
+    last_message_id = channel.last_message_id
+    warning_id = ticket["warning_id"]
+    if warning_id:
+        if last_message_id and last_message_id > warning_id:
+            return "clear"
+        warned_at = discord.utils.snowflake_time(warning_id).timestamp()
+        return "close" if now - warned_at >= STALE_TICKET_GRACE else None
+    if last_message_id:
+        last_active = discord.utils.snowflake_time(last_message_id).timestamp()
+    else:
+        last_active = ticket["opened_at"] or now
+    return "warn" if now - last_active >= STALE_TICKET_AFTER else None
+
+# (guild_id, user_id) -> task opening that user's ticket, so double clicks share one channel
+opening_tickets = {}
+
+# We define CloseTicketView first so it is definitely available
+class CloseTicketView(discord.ui.View):
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    @discord.ui.button(label="Close & Archive", style=discord.ButtonStyle.red, emoji="🔒", custom_id="ticket_close_btn")
+    @metrics.traced("close_ticket")
+    async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_message("Archiving ticket...")
+        try:
+            count = await archive_ticket(interaction.channel, closed_by=interaction.user.id)
+            if count is None:
+                await interaction.followup.send("This ticket is already closed or being archived.", ephemeral=True)
+        except Exception as e:
+            log.exception("Failed to archive ticket %s", interaction.channel.name, extra={"channel_id": interaction.channel.id})
+            await interaction.followup.send(f"❌ Failed to archive this ticket: {e}")
+
+class TicketView(discord.ui.View):
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    @discord.ui.button(label="Open a Life Support Ticket", style=discord.ButtonStyle.green, emoji="🎟", custom_id="ticket_create_btn")
+    @metrics.traced("create_ticket")
+    async def create_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Defer first so channel creation under load never misses the 3 second deadline
+        with metrics.timer("create_ticket.defer"):
+            await interaction.response.defer(ephemeral=True, thinking=True)
+
+        key = (interaction.guild.id, interaction.user.id)
+        pending = opening_tickets.get(key)
+        duplicate = pending is not None
+        if not duplicate:
+            pending = opening_tickets[key] = asyncio.create_task(open_ticket(interaction.guild, interaction.user))
+            pending.add_done_callback(lambda task: opening_tickets.pop(key, None))
+        else:
+            metrics.inc("create_ticket.deduplicated")
+
+        ticket_channel, number, created = await asyncio.shield(pending)
+        if not created or duplicate:
+            return await interaction.followup.send(f"You already have an open ticket: {ticket_channel.mention}", ephemeral=True)
+
+        # 5. Reply to the user and post the ticket menu at the same time
+        await asyncio.gather(
+            interaction.followup.send(f"Your Life Support ticket has been opened: {ticket_channel.mention}", ephemeral=True),
+            post_ticket_menu(ticket_channel, interaction.user, number)
+        )
+
+class Tickets(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        guild_config.subscribe(self.on_config_change)
+        if STALE_TICKET_AFTER:
+            self.stale_sweep.start()
+
+    async def cog_unload(self):
+        guild_config.unsubscribe(self.on_config_change)
+        self.stale_sweep.cancel()
+
+    def on_config_change(self, guild_id, key, value):
+        # The cached role and overwrite templates are built from the support role
+        if key == "support_role_id":
+            resources.invalidate_roles(guild_id)
+        elif key in ("ticket_category", "closed_category"):
+            resources.invalidate_categories(guild_id)
+
+    @tasks.loop(seconds=STALE_SWEEP_INTERVAL)
+    async def stale_sweep(self):
+        # 1. Find stale tickets from the index and the channel cache (API calls only for channels missing from it)
+        now = time.time()
+        due = []
+        for ticket in ticket_store.open_tickets():
+            guild = self.bot.get_guild(ticket["guild_id"])
+            if guild is None or guild.unavailable:
+                # Not one of ours (another shard process) or not loaded yet: its channel cache is empty
+                continue
+            channel = guild.get_channel(ticket["channel_id"])
+            if channel is None:
+                # Closed only once Discord confirms the channel was deleted by hand
+                try:
+                    channel = await guild.fetch_channel(ticket["channel_id"])
+                except discord.NotFound:
+                    ticket_store.close(ticket["channel_id"])
+                    ticket_analytics.closed(guild.id, ticket["channel_id"], ticket["number"])
+                    continue
+                except discord.HTTPException as e:
+                    log.warning("Could not check ticket channel %s: %s", ticket["channel_id"], e)
+                    continue
+            action = stale_action(ticket, channel, now)
+            if action == "clear":
+                ticket_store.set_warning(channel.id, None)
+            elif action:
+                due.append((action, ticket, channel))
+
+        # 2. Warn or close them a few at a time, pausing between batches
+        for start in range(0, len(due), STALE_SWEEP_BATCH):
+            if start:
+                await asyncio.sleep(STALE_SWEEP_PAUSE)
+            await asyncio.gather(*(self.handle_stale(*item) for item in due[start:start + STALE_SWEEP_BATCH]))
+
+    @stale_sweep.before_loop
+    async def before_stale_sweep(self):
+        await self.bot.wait_until_ready()
+
+    async def handle_stale(self, action, ticket, channel):
+        try:
+            if action == "warn":
+                opener = f"<@{ticket['opener_id']}> " if ticket["opener_id"] else ""
+                warning = await outbound.send(
+                    channel,
+                    content=f"{opener}⏰ This ticket has had no activity for {format_duration(STALE_TICKET_AFTER)}. "
+                            f"It will be closed automatically in {format_duration(STALE_TICKET_GRACE)} unless someone replies.",
+                    priority=NORMAL,
+                    coalesce=("stale", channel.id)
+                )
+                if warning is None:
+                    # Dropped on shutdown; the next sweep after the restart warns again
+                    return
+                ticket_store.set_warning(channel.id, warning.id)
+                metrics.inc("stale.warned")
+            else:
+                with metrics.timer("stale.close"):
+                    count = await archive_ticket(channel)
+                if count is not None:
+                    metrics.inc("stale.closed")
+        except Exception:
+            log.exception("Failed to %s stale ticket %s", action, channel.name, extra={"channel_id": channel.id})
+
+    def seed_index(self, guild):
+        # Seed the ticket index from the categories only for guilds we have never seen. An unavailable
+        # guild has no channels cached yet and would be seeded as empty; on_guild_available retries it
+        if not guild.unavailable and not ticket_store.has_guild(guild.id):
+            ticket_store.rebuild(guild, resources)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for guild in self.bot.guilds:
+            self.seed_index(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild):
+        self.seed_index(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        self.seed_index(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        resources.forget(guild.id)
+        guild_config.forget(guild.id)
+
+    # Keep the cached categories/roles in sync with the server
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        if isinstance(channel, discord.CategoryChannel):
+            resources.invalidate_categories(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if isinstance(channel, discord.CategoryChannel):
+            resources.invalidate_categories(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if isinstance(after, discord.CategoryChannel) and before.name != after.name:
+            resources.invalidate_categories(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        resources.invalidate_roles(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        resources.invalidate_roles(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        resources.invalidate_roles(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        # A dict lookup first: almost no message is the first one in a ticket still waiting for support
+        if not ticket_analytics.awaiting_response(message.channel.id) or message.author.bot:
+            return
+        support_role = resources.support_role(message.guild)
+        if support_role is None or not isinstance(message.author, discord.Member) or message.author.get_role(support_role.id) is None:
+            return
+        ticket = ticket_store.get_by_channel(message.channel.id)
+        ticket_analytics.responded(message.guild.id, message.channel.id, ticket["number"] if ticket else None, message.author.id)
+
+    @commands.command(name="reindex")
+    @metrics.traced("!reindex")
+    async def reindex(self, ctx):
+        if not ctx.author.guild_permissions.administrator:
+            return await ctx.send("❌ You need Administration permission for this.", delete_after=5)
+        highest = ticket_store.rebuild(ctx.guild, resources)
+        await ctx.send(f"✅ **Ticket index rebuilt.** Highest ticket found: #{highest:04d}.")
+
+    @commands.command(name="cachestats")
+    @metrics.traced("!cachestats")
+    async def cachestats(self, ctx):
+        if not ctx.author.guild_permissions.administrator:
+            return await ctx.send("❌ You need Administration permission for this.", delete_after=5)
+        total = resources.hits + resources.misses
+        rate = resources.hits / total * 100 if total else 0
+        await ctx.send(f"🗂️ **Resource cache:** {resources.hits} hits, {resources.misses} misses ({rate:.1f}% hit rate).")
+
+    @app_commands.command(name="setup_tickets", description="Spawns the Ticket System Panel")
+    @metrics.traced("setup_tickets")
+    async def setup_tickets(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            return await interaction.response.send_message("Admins only.", ephemeral=True)
+
+        embed = discord.Embed(
+            title="Life Lounge Support",
+            description="Click the button to get direct help from moderators.",
+            color=discord.Color.green()
+        )
+        # Queued ahead of background traffic; deferred so a busy queue never misses the 3 second deadline
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            panel = await outbound.send(interaction.channel, embed=embed, view=TicketView(), priority=HIGH)
+        except discord.HTTPException as e:
+            log.warning("Could not post the ticket panel in %s: %s", interaction.channel, e, extra={"channel_id": interaction.channel.id})
+            return await interaction.followup.send(f"❌ Couldn't post the ticket panel here: {e}", ephemeral=True)
+        if panel is None:
+            return await interaction.followup.send("❌ The ticket panel was not posted because the bot is shutting down.", ephemeral=True)
+        await interaction.followup.send("Ticket panel created!", ephemeral=True)
+
+    @app_commands.command(name="transcript", description="Fetch the saved transcript of a closed ticket.")
+    @app_commands.describe(number="Ticket number, e.g. 12 for ticket-0012")
+    @metrics.traced("transcript")
+    async def transcript(self, interaction: discord.Interaction, number: int):
+        ticket = ticket_store.get_by_number(interaction.guild.id, number)
+        if not ticket or not ticket["transcript_path"]:
+            return await interaction.response.send_message(f"❌ No transcript found for ticket #{number:04d}.", ephemeral=True)
+
+        # Admins, the support role and the person who opened the ticket may read it
+        is_admin = interaction.user.guild_permissions.administrator
+        support_role_id = guild_config.get(interaction.guild.id, "support_role_id")
+        is_support = support_role_id != 0 and interaction.user.get_role(support_role_id) is not None
+        if not (is_admin or is_support or interaction.user.id == ticket["opener_id"]):
+            return await interaction.response.send_message("🚫 You can only read transcripts of your own tickets.", ephemeral=True)
+
+        path = ticket["transcript_path"]
+        if not os.path.exists(path):
+            return await interaction.response.send_message(f"❌ The transcript file for ticket #{number:04d} is missing.", ephemeral=True)
+
+        # Very long tickets can outgrow the upload limit even compressed
+        too_large = f"❌ The transcript of ticket #{number:04d} is too large to upload here; ask an admin for `{path}`."
+        if os.path.getsize(path) > interaction.guild.filesize_limit:
+            return await interaction.response.send_message(too_large, ephemeral=True)
+        try:
+            await interaction.response.send_message(
+                f"📄 Transcript of ticket #{number:04d}.",
+                file=discord.File(path, filename=os.path.basename(path)),
+                ephemeral=True
+            )
+        except discord.HTTPException as e:
+            if e.status != 413:
+                raise
+            await interaction.response.send_message(too_large, ephemeral=True)
+
+    @app_commands.command(name="ticket_stats", description="Ticket volume, response times and who handled them.")
+    @metrics.traced("ticket_stats")
+    async def ticket_stats(self, interaction: discord.Interaction):
+        support_role_id = guild_config.get(interaction.guild.id, "support_role_id")
+        is_admin = interaction.user.guild_permissions.administrator
+        is_support = support_role_id != 0 and interaction.user.get_role(support_role_id) is not None
+        if not (is_admin or is_support):
+            return await interaction.response.send_message("Admins and support staff only.", ephemeral=True)
+
+        stats = ticket_analytics.guilds.get(interaction.guild.id)
+        if not stats or not stats.opened:
+            return await interaction.response.send_message("No tickets recorded yet.", ephemeral=True)
+
+        embed = discord.Embed(title="📈 Ticket Stats", color=discord.Color.blurple())
+        embed.add_field(name="Opened", value=str(stats.opened))
+        embed.add_field(name="Closed", value=str(stats.closed))
+        embed.add_field(name="Open now", value=f"{stats.open} ({stats.awaiting} awaiting a reply)")
+        embed.add_field(
+            name="First response",
+            value=f"median {format_duration(stats.first_response.median())} over {stats.first_response.count} tickets"
+        )
+        embed.add_field(
+            name="Time to close",
+            value=f"median {format_duration(stats.resolution.median())} over {stats.resolution.count} tickets"
+        )
+        staff = stats.responses_by_staff + stats.closes_by_staff
+        if staff:
+            lines = [
+                f"<@{staff_id}>: {stats.responses_by_staff[staff_id]} first replies, {stats.closes_by_staff[staff_id]} closes"
+                for staff_id, _ in staff.most_common(10)
+            ]
+            embed.add_field(name="Staff", value="\n".join(lines), inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    # Persistent views, so panels and close buttons posted before a restart keep working
+    bot.add_view(TicketView())
+    bot.add_view(CloseTicketView())
+    await bot.add_cog(Tickets(bot))
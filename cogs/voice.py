@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import re
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from config import BULK_DISCONNECT_WORKERS, DB_PATH
+from core import metrics, outbound
+from disconnects import disconnect_members
+from outbound import NORMAL
+from timers import DisconnectScheduler
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# VOICE DISCONNECT TIMERS
+# ==============================================================================
+
+# User mentions (<@123>, <@!123>) or bare IDs in the /bulk_disconnect member list
+MEMBER_ID = re.compile(r"\d{15,20}")
+# Failed members listed by name in a summary; the rest are only counted
+SUMMARY_MAX_FAILURES = 15
+
+class Voice(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.scheduler = DisconnectScheduler(DB_PATH, on_fire=self.fire_disconnects)
+
+    async def cog_load(self):
+        # One loop drives every disconnect timer (including ones restored from disk)
+        self.scheduler_task = asyncio.create_task(self.run_scheduler())
+
+    async def cog_unload(self):
+        self.scheduler_task.cancel()
+        self.scheduler.flush()
+
+    async def run_scheduler(self):
+        # Restored timers need the guild/member cache, so wait for the gateway first
+        await self.bot.wait_until_ready()
+        await self.scheduler.run()
+
+    async def fire_disconnects(self, batch):
+        """
+        Called by the scheduler with every timer that came due at the same moment.
+        Members scheduled together (e.g. by /bulk_disconnect) get one summary per channel.
+        """
+        metrics.inc("disconnect.fired", len(batch))
+        groups = {}
+        for guild_id, member_id, channel_id in batch:
+            groups.setdefault((guild_id, channel_id), []).append(member_id)
+        await asyncio.gather(*(
+            self.disconnect_and_report(guild_id, channel_id, member_ids)
+            for (guild_id, channel_id), member_ids in groups.items()
+        ))
+
+    async def disconnect_and_report(self, guild_id, channel_id, member_ids):
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return
+        # Members in voice stay cached even with the lean memory profile, so a miss means they already left
+        members = [member for member in map(guild.get_member, member_ids) if member]
+        with metrics.timer("disconnect.batch"):
+            result = await disconnect_members(members, workers=BULK_DISCONNECT_WORKERS, reason="Disconnect timer reached")
+        self.record(result)
+        if not result.disconnected and not result.failed:
+            return
+
+        channel = guild.get_channel(channel_id)
+        if not channel:
+            return
+        try:
+            if len(member_ids) == 1 and result.disconnected:
+                member = result.disconnected[0]
+                await outbound.send(
+                    channel, content=f"✅ **{member.name}** has been disconnected (Timer Reached).",
+                    priority=NORMAL, coalesce=("disconnected", channel.id, member.id)
+                )
+            else:
+                await outbound.send(channel, embed=summary_embed(result, "Timer Reached"), priority=NORMAL)
+        except discord.HTTPException as e:
+            log.warning("Could not post the disconnect report in %s: %s", channel.name, e, extra={"channel_id": channel.id})
+
+    def record(self, result):
+        metrics.inc("disconnect.moved", len(result.disconnected))
+        metrics.inc("disconnect.failed", len(result.failed))
+        for member, reason in result.failed:
+            log.warning("Error disconnecting %s: %s", member.name, reason, extra={"member_id": member.id})
+
+    @app_commands.command(name="disconnect", description="Disconnect a user from Voice after a specific time.")
+    @app_commands.describe(member="Who to disconnect", seconds="Seconds to wait", minutes="Minutes to wait")
+    @metrics.traced("disconnect")
+    async def disconnect(self, interaction: discord.Interaction, member: discord.Member, seconds: int = 0, minutes: int = 0):
+        is_admin = interaction.user.guild_permissions.administrator
+        is_self = interaction.user.id == member.id
+
+        if not is_self and not is_admin:
+            return await interaction.response.send_message("🚫 You can only disconnect yourself. Ask an Admin to disconnect others.", ephemeral=True)
+
+        if not member.voice:
+            return await interaction.response.send_message(f"{member.name} is not in a voice channel.", ephemeral=True)
+
+        total_seconds = seconds + (minutes * 60)
+        if total_seconds <= 0:
+            return await interaction.response.send_message("Please provide a valid time.", ephemeral=True)
+
+        metrics.inc("disconnect.scheduled")
+        self.scheduler.schedule(interaction.guild.id, member.id, interaction.channel.id, time.time() + total_seconds)
+
+        embed = discord.Embed(
+            title="⏳ Timer Set",
+            description=f"Disconnecting **{member.name}** in **{total_seconds}** seconds.\nUse `/cancel` to stop.",
+            color=discord.Color.orange()
+        )
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name="cancel", description="Cancel an active disconnect timer.")
+    @app_commands.describe(member="Who to cancel the timer for")
+    @metrics.traced("cancel")
+    async def cancel(self, interaction: discord.Interaction, member: discord.Member):
+        is_admin = interaction.user.guild_permissions.administrator
+        is_self = interaction.user.id == member.id
+
+        if not is_self and not is_admin:
+            return await interaction.response.send_message("🚫 You can only cancel your own timers.", ephemeral=True)
+
+        if self.scheduler.cancel(interaction.guild.id, member.id):
+            await interaction.response.send_message(f"✅ Cancelled the disconnect timer for **{member.name}**.")
+        else:
+            await interaction.response.send_message(f"❌ No active timer found for **{member.name}**.", ephemeral=True)
+
+    @app_commands.command(name="bulk_disconnect", description="Disconnect everyone in a voice channel, with a role, or from a list.")
+    @app_commands.describe(
+        channel="Everyone in this voice channel",
+        role="Everyone with this role who is in voice",
+        members="Mentions or IDs, separated by spaces",
+        seconds="Seconds to wait (0 = now)",
+        minutes="Minutes to wait"
+    )
+    @metrics.traced("bulk_disconnect")
+    async def bulk_disconnect(self, interaction: discord.Interaction, channel: discord.VoiceChannel = None,
+                              role: discord.Role = None, members: str = None, seconds: int = 0, minutes: int = 0):
+        if not interaction.user.guild_permissions.move_members:
+            return await interaction.response.send_message("🚫 You need the Move Members permission for this.", ephemeral=True)
+        if channel is None and role is None and not members:
+            return await interaction.response.send_message("Pick a voice channel, a role or a list of members.", ephemeral=True)
+
+        guild = interaction.guild
+        targets = {}
+        if channel:
+            targets.update((member.id, member) for member in channel.members)
+        if role:
+            targets.update((member.id, member) for member in role.members if member.voice)
+        if members:
+            for member_id in map(int, MEMBER_ID.findall(members)):
+                member = guild.get_member(member_id)
+                if member:
+                    targets[member.id] = member
+        targets = [member for member in targets.values() if member.voice]
+        if not targets:
+            return await interaction.response.send_message("Nobody matching that is in voice right now.", ephemeral=True)
+
+        total_seconds = max(seconds, 0) + max(minutes, 0) * 60
+        if total_seconds:
+            # One shared deadline, so the scheduler fires them as a single batch with one summary
+            deadline = time.time() + total_seconds
+            self.scheduler.schedule_many((guild.id, member.id, interaction.channel.id, deadline) for member in targets)
+            metrics.inc("disconnect.scheduled", len(targets))
+            embed = discord.Embed(
+                title="⏳ Timer Set",
+                description=f"Disconnecting **{len(targets)}** members in **{total_seconds}** seconds.\nUse `/cancel` to stop one.",
+                color=discord.Color.orange()
+            )
+            return await interaction.response.send_message(embed=embed)
+
+        await interaction.response.defer(thinking=True)
+        with metrics.timer("disconnect.batch"):
+            result = await disconnect_members(targets, workers=BULK_DISCONNECT_WORKERS, reason=f"Bulk disconnect by {interaction.user}")
+        self.record(result)
+        await interaction.followup.send(embed=summary_embed(result, f"Requested by {interaction.user.name}"))
+
+def summary_embed(result, footer):
+    """
+    One message for a whole batch: the count, plus every member who could not be moved (up to a limit).
+    """
+    color = discord.Color.orange() if result.failed else discord.Color.green()
+    embed = discord.Embed(
+        title="🔌 Voice Disconnect",
+        description=f"Disconnected **{len(result.disconnected)}** of {len(result)} members.",
+        color=color
+    )
+    if result.not_in_voice:
+        embed.add_field(name="Already left", value=str(len(result.not_in_voice)))
+    if result.failed:
+        lines = [f"**{member.name}**: {reason}" for member, reason in result.failed[:SUMMARY_MAX_FAILURES]]
+        if len(result.failed) > SUMMARY_MAX_FAILURES:
+            lines.append(f"…and {len(result.failed) - SUMMARY_MAX_FAILURES} more")
+        embed.add_field(name=f"Failed ({len(result.failed)})", value="\n".join(lines)[:1024], inline=False)
+    embed.set_footer(text=footer)
+    return embed
+
+async def setup(bot):
+    await bot.add_cog(Voice(bot))
@@ -0,0 +1,103 @@
+import logging
+
+import discord
+from discord.ext import commands, tasks
+
+from config import JOIN_RATE_INTERVAL, RAID_ALERT_JOINS, WELCOME_SUMMARY_THRESHOLD, WELCOME_WINDOW
+from core import guild_config, metrics, outbound
+from joins import JoinBuffer
+from outbound import HIGH, LOW
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# WELCOME MESSAGES
+# ==============================================================================
+
+class Welcome(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.join_buffer = JoinBuffer(WELCOME_WINDOW, on_flush=self.send_welcome, raid_threshold=RAID_ALERT_JOINS, on_raid=self.raid_alert)
+
+    async def cog_load(self):
+        self.publish_join_rates.start()
+
+    async def cog_unload(self):
+        self.publish_join_rates.cancel()
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        # Every join counts towards the join rate and raid detection, even where no welcome is sent
+        guild_id = member.guild.id
+        self.join_buffer.add(guild_id, member)
+        metrics.gauge(f"welcome.join_rate.{guild_id}", self.join_buffer.join_rate(guild_id))
+
+    @tasks.loop(seconds=JOIN_RATE_INTERVAL)
+    async def publish_join_rates(self):
+        # Lets the gauges fall back to 0 once a wave is over, without waiting for the next join
+        for guild_id, rate in self.join_buffer.join_rates().items():
+            metrics.gauge(f"welcome.join_rate.{guild_id}", rate)
+
+    async def send_welcome(self, guild_id, members):
+        """
+        Sends one welcome per join window: the guild's welcome message for one or a few joins (with the
+        avatar for a single one), and only the summary once the window is above WELCOME_SUMMARY_THRESHOLD.
+        """
+        guild = self.bot.get_guild(guild_id)
+        channel = guild.system_channel if guild else None
+        if not channel:
+            return
+
+        settings = guild_config.all(guild_id)
+        title = settings["welcome_title"]
+        if len(members) == 1:
+            member = members[0]
+            embed = discord.Embed(
+                title=title,
+                description=settings["welcome_message"].format(mentions=member.mention, server=guild.name),
+                color=discord.Color.teal()
+            )
+            embed.set_thumbnail(url=member.display_avatar.url)
+        elif len(members) <= WELCOME_SUMMARY_THRESHOLD:
+            mentions = ", ".join(member.mention for member in members)
+            embed = discord.Embed(
+                title=title,
+                description=settings["welcome_message"].format(mentions=mentions, server=guild.name),
+                color=discord.Color.teal()
+            )
+        else:
+            embed = discord.Embed(
+                title=title,
+                description=settings["welcome_summary"].format(count=len(members), server=guild.name),
+                color=discord.Color.teal()
+            )
+        with metrics.timer("welcome.send"):
+            # Lowest priority: a welcome can wait, or be dropped under heavy backlog
+            await outbound.send(channel, embed=embed, priority=LOW)
+        metrics.inc("welcome.members", len(members))
+
+    async def raid_alert(self, guild_id, joins):
+        guild = self.bot.get_guild(guild_id)
+        name = guild.name if guild else guild_id
+        metrics.inc("welcome.raid_alerts")
+        log.warning("RAID ALERT: %s joins in the last minute in %s", joins, name, extra={"guild_id": guild_id})
+        if not guild:
+            return
+
+        # The configured alert channel, else the moderator-only channel Discord gives community servers
+        alert_channel_id = guild_config.get(guild_id, "alert_channel_id")
+        channel = guild.get_channel(alert_channel_id) if alert_channel_id else guild.public_updates_channel
+        if not channel:
+            return log.warning("No alert channel for the raid alert in %s; set one with /config alert_channel", name)
+        embed = discord.Embed(
+            title="🚨 Possible raid",
+            description=f"**{joins} members** joined **{name}** in the last minute.",
+            color=discord.Color.red()
+        )
+        try:
+            await outbound.send(channel, embed=embed, priority=HIGH, coalesce=("raid", guild_id))
+        except discord.HTTPException as e:
+            log.warning("Could not post the raid alert in %s: %s", channel.name, e, extra={"guild_id": guild_id})
+
+async def setup(bot):
+    await bot.add_cog(Welcome(bot))
@@ -0,0 +1,120 @@
+# ==============================================================================
+# CONFIGURATION
+# ==============================================================================
+# Kept out of lg.py so the extensions in cogs/ can read it: lg.py runs as
+# __main__, and importing it from an extension would start a second bot.
+import os
+
+# Prefer setting LIFEGIVER_TOKEN in the environment over editing this file
+TOKEN = os.environ.get("LIFEGIVER_TOKEN", "TOKENNNHEREEE")
+
+# ------------------------------------------------------------------------------
+# Per-guild defaults. Admins override these for their own server with /config;
+# these values apply to every guild that has not changed them.
+# ------------------------------------------------------------------------------
+# ID of the role to ping when a ticket is opened (e.g. SupportAdmins), 0 for none
+SUPPORT_ROLE_ID = 000000000000000000
+# Categories new tickets are opened in and closed tickets are moved to
+TICKET_CATEGORY = "Life Support Tickets"
+CLOSED_CATEGORY = "Closed Tickets"
+# Welcome embed. {mentions} is the new member(s), {count} how many joined, {server} the server name
+WELCOME_TITLE = "New Life Has Entered!"
+WELCOME_MESSAGE = "Welcome to **{server}**, {mentions}! We are glad you are here."
+WELCOME_SUMMARY = "**{count} new members** just joined **{server}**. Welcome, everyone!"
+# Channel raid alerts are posted in, 0 for the server's moderator-only community updates channel
+ALERT_CHANNEL_ID = 0
+# ------------------------------------------------------------------------------
+
+# Local SQLite file holding the bot's state (ticket index, pending disconnect timers)
+DB_PATH = "lifegiver.db"
+
+# Sharding: False runs one gateway connection, True runs an AutoShardedBot.
+# Leave SHARD_COUNT/SHARD_IDS as None to let Discord pick, or split shards across
+# processes, e.g. SHARD_COUNT = 4 with SHARD_IDS = [0, 1] here and [2, 3] in another copy.
+SHARDED = False
+SHARD_COUNT = None
+SHARD_IDS = None
+
+# "default" caches every member and 1000 messages; "lean" only caches members in voice
+# or who joined while running, keeps 100 messages and skips chunking at startup (see memory.py)
+MEMORY_PROFILE = "default"
+
+# Command groups, loaded as extensions from setup_hook. Drop one to disable its commands.
+EXTENSIONS = [
+    "cogs.tickets",
+    "cogs.voice",
+    "cogs.moderation",
+    "cogs.welcome",
+    "cogs.general",
+    "cogs.settings",
+]
+
+# Activities the bot rotates through, one per PRESENCE_INTERVAL seconds.
+# Types: "playing", "watching", "listening", "competing".
+# {open_tickets} and {guilds} are filled in from counters the bot already keeps.
+PRESENCE_ACTIVITIES = [
+    ("watching", "Life Lounge"),
+    ("playing", "Giving Life"),
+    ("watching", "{open_tickets} open tickets"),
+]
+PRESENCE_INTERVAL = 30
+
+# Joins within this many seconds share one welcome message
+WELCOME_WINDOW = 5
+# Above this many joins in one window only a "N new members" summary is sent
+WELCOME_SUMMARY_THRESHOLD = 10
+# Joins per minute that trigger a raid alert (None disables it)
+RAID_ALERT_JOINS = 30
+# How often the per-guild join rate is published as the welcome.join_rate.<guild id> gauge
+JOIN_RATE_INTERVAL = 10
+
+# Voice moves running at once for /bulk_disconnect and timers that fire together
+BULK_DISCONNECT_WORKERS = 4
+
+# Upper bound for /clean so a single command cannot tie up the channel for minutes
+CLEAN_MAX_AMOUNT = 1000
+
+# Closed tickets are exported here as gzip-compressed JSONL transcripts
+TRANSCRIPT_DIR = "transcripts"
+# Attachments up to this size are copied next to the transcript, since their Discord links stop
+# working once the channel is deleted; larger ones keep only the link (0 turns copying off)
+TRANSCRIPT_ATTACHMENT_MAX_BYTES = 8 * 1024 * 1024
+# True = delete the channel after archiving, False = keep it in the closed category
+DELETE_CLOSED_TICKETS = True
+
+# Open tickets with no messages for STALE_TICKET_AFTER seconds get a warning, and are closed
+# (same as the Close button) if nobody replies within STALE_TICKET_GRACE. None turns it off.
+STALE_TICKET_AFTER = 3 * 24 * 60 * 60
+STALE_TICKET_GRACE = 24 * 60 * 60
+STALE_SWEEP_INTERVAL = 15 * 60
+# Tickets warned/closed at once, and the pause between batches, so a big sweep leaves
+# rate-limit room for people using the bot
+STALE_SWEEP_BATCH = 5
+STALE_SWEEP_PAUSE = 10
+
+# Background messages (welcomes, notices, ticket menus) go through one queue. Welcomes and notices
+# share OUTBOUND_RATE sends per second; everything keeps to OUTBOUND_ROUTE_LIMIT per channel per
+# OUTBOUND_ROUTE_WINDOW seconds, leaving the rest of Discord's budget to replies (see outbound.py)
+OUTBOUND_RATE = 25
+OUTBOUND_ROUTE_LIMIT = 5
+OUTBOUND_ROUTE_WINDOW = 5
+OUTBOUND_WORKERS = 4
+# Above this many queued messages the oldest low-priority ones (welcomes) are dropped
+OUTBOUND_MAX_PENDING = 500
+
+# Logs are written as JSON lines to LOG_PATH, which is rotated at LOG_MAX_BYTES with LOG_BACKUPS old files kept
+LOG_PATH = "logs/lifegiver.jsonl"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+LOG_LEVEL = "INFO"
+# Errors are also posted to this channel (None turns it off), at most ERROR_REPORT_LIMIT
+# per ERROR_REPORT_WINDOW seconds; the rest are counted in the next report
+ERROR_REPORT_CHANNEL_ID = None
+ERROR_REPORT_LIMIT = 5
+ERROR_REPORT_WINDOW = 60
+
+# Metrics are dumped here as JSON every METRICS_DUMP_INTERVAL seconds
+METRICS_DUMP_PATH = "metrics.json"
+METRICS_DUMP_INTERVAL = 60
+# Set to a port (e.g. 9100) to serve Prometheus text at http://127.0.0.1:<port>/metrics
+METRICS_PORT = None
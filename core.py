@@ -0,0 +1,35 @@
+from config import (
+    ALERT_CHANNEL_ID, CLOSED_CATEGORY, DB_PATH, OUTBOUND_MAX_PENDING, OUTBOUND_RATE, OUTBOUND_ROUTE_LIMIT, OUTBOUND_ROUTE_WINDOW,
+    OUTBOUND_WORKERS, SUPPORT_ROLE_ID, TICKET_CATEGORY, WELCOME_MESSAGE, WELCOME_SUMMARY, WELCOME_TITLE,
+)
+from analytics import TicketAnalytics
+from guildconfig import GuildConfigStore
+from metrics import Metrics
+from outbound import OutboundQueue
+from sync import CommandSyncCache
+from tickets import GuildResources, TicketStore
+
+# ==============================================================================
+# SHARED STATE
+# ==============================================================================
+# One instance of each store for the whole process. lg.py and every extension
+# import them from here; lg.py itself is never imported (it runs as __main__).
+
+guild_config = GuildConfigStore(DB_PATH, defaults={
+    "support_role_id": SUPPORT_ROLE_ID,
+    "ticket_category": TICKET_CATEGORY,
+    "closed_category": CLOSED_CATEGORY,
+    "welcome_title": WELCOME_TITLE,
+    "welcome_message": WELCOME_MESSAGE,
+    "welcome_summary": WELCOME_SUMMARY,
+    "alert_channel_id": ALERT_CHANNEL_ID,
+})
+ticket_store = TicketStore(DB_PATH)
+ticket_analytics = TicketAnalytics(DB_PATH)
+resources = GuildResources(guild_config)
+metrics = Metrics()
+command_sync = CommandSyncCache(DB_PATH)
+outbound = OutboundQueue(
+    metrics, rate=OUTBOUND_RATE, route_limit=OUTBOUND_ROUTE_LIMIT, route_window=OUTBOUND_ROUTE_WINDOW,
+    workers=OUTBOUND_WORKERS, max_pending=OUTBOUND_MAX_PENDING,
+)
@@ -0,0 +1,52 @@
+import asyncio
+
+import discord
+
+# ==============================================================================
+# BULK VOICE DISCONNECTS
+# ==============================================================================
+# Moves many members out of voice through a small pool of workers. Every move
+# is a PATCH on the same guild's member route, so discord.py queues them behind
+# one rate-limit bucket anyway; the pool only caps how many wait there at once.
+
+
+class DisconnectResult:
+    def __init__(self):
+        self.disconnected = []
+        self.not_in_voice = []
+        self.failed = []  # (member, reason)
+
+    def __len__(self):
+        return len(self.disconnected) + len(self.not_in_voice) + len(self.failed)
+
+    def __str__(self):
+        text = f"disconnected {len(self.disconnected)}"
+        if self.not_in_voice:
+            text += f", {len(self.not_in_voice)} already left"
+        if self.failed:
+            text += f", failed {len(self.failed)}"
+        return text
+
+
+async def disconnect_members(members, workers=4, reason=None):
+    """
+    Disconnects every member still in voice, at most `workers` moves in flight.
+    Members are deduplicated; one failing never stops the rest.
+    """
+    result = DisconnectResult()
+    pending = iter({member.id: member for member in members}.values())
+
+    async def worker():
+        # The workers share one iterator, so each member is taken exactly once
+        for member in pending:
+            if not member.voice:
+                result.not_in_voice.append(member)
+                continue
+            try:
+                await member.move_to(None, reason=reason)
+                result.disconnected.append(member)
+            except discord.HTTPException as e:
+                result.failed.append((member, e.text or str(e)))
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return result
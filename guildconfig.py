@@ -0,0 +1,140 @@
+import sqlite3
+import string
+
+# ==============================================================================
+# PER-GUILD CONFIGURATION
+# ==============================================================================
+# Settings that used to be module constants (support role, category names,
+# welcome text) stored per guild in SQLite. Handlers read them from an
+# in-memory copy: the first lookup for a guild loads its rows once, every later
+# one is a dict lookup. Writes go to SQLite and the cache together and are
+# announced to subscribers, so caches built on a setting can drop their copy.
+
+# Text settings and their Discord limits: 100 characters for channel names, 256 for embed titles
+MAX_LENGTH = {
+    "ticket_category": 100,
+    "closed_category": 100,
+    "welcome_title": 256,
+    "welcome_message": 2000,
+    "welcome_summary": 2000,
+}
+# Placeholders of the settings that are filled in with str.format, each with a sample of the type it is
+# formatted with; the others are used as written, so braces in e.g. a category name are just characters
+TEMPLATE_FIELDS = {
+    "welcome_message": {"mentions": "", "server": ""},
+    "welcome_summary": {"count": 0, "server": ""},
+}
+
+
+def validate(key, value):
+    """
+    Raises ValueError with a message fit to show the admin if value cannot be used for key.
+    """
+    if key not in MAX_LENGTH:
+        raise ValueError(f"`{key}` is not a text setting.")
+    value = value.strip()
+    if not value:
+        raise ValueError(f"`{key}` cannot be empty.")
+    if len(value) > MAX_LENGTH[key]:
+        raise ValueError(f"`{key}` can be at most {MAX_LENGTH[key]} characters.")
+    if key not in TEMPLATE_FIELDS:
+        return value
+    allowed = TEMPLATE_FIELDS[key]
+    try:
+        parsed = [(field, spec) for _, field, spec, _ in string.Formatter().parse(value) if field is not None]
+    except ValueError:
+        raise ValueError(f"`{key}` has an unmatched `{{` or `}}`.") from None
+    unknown = [field for field, _ in parsed if field not in allowed]
+    if unknown:
+        placeholders = ", ".join(f"`{{{field}}}`" for field in allowed)
+        raise ValueError(f"`{{{unknown[0]}}}` is not a placeholder for `{key}` (allowed: {placeholders}).")
+    # A placeholder inside a format spec (`{server:{server}}`) makes the spec depend on the server name
+    if any("{" in spec for _, spec in parsed):
+        raise ValueError(f"`{key}` cannot use a placeholder inside another one.")
+    # Format specs like `{server:d}` only fail once formatted
+    try:
+        value.format(**allowed)
+    except (ValueError, KeyError, IndexError) as e:
+        raise ValueError(f"`{key}` cannot be filled in: {e}") from None
+    return value
+
+
+class GuildConfigStore:
+    """
+    guild_id -> {setting: value}, falling back to `defaults` for anything a guild has not set.
+    Values keep the type of their default, so support_role_id always comes back as an int.
+    """
+    def __init__(self, path, defaults):
+        self.defaults = dict(defaults)
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS guild_config ("
+            "guild_id INTEGER NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (guild_id, key))"
+        )
+        self.db.commit()
+        self._cache = {}
+        self._listeners = []
+
+    def _load(self, guild_id):
+        settings = dict(self.defaults)
+        for key, value in self.db.execute("SELECT key, value FROM guild_config WHERE guild_id = ?", (guild_id,)):
+            # Rows for settings that no longer exist are ignored
+            if key in self.defaults:
+                settings[key] = type(self.defaults[key])(value)
+        self._cache[guild_id] = settings
+        return settings
+
+    def _settings(self, guild_id):
+        settings = self._cache.get(guild_id)
+        if settings is None:
+            settings = self._load(guild_id)
+        return settings
+
+    def get(self, guild_id, key):
+        return self._settings(guild_id)[key]
+
+    def all(self, guild_id):
+        return dict(self._settings(guild_id))
+
+    def is_default(self, guild_id, key):
+        return self.get(guild_id, key) == self.defaults[key]
+
+    def set(self, guild_id, key, value):
+        value = type(self.defaults[key])(value)
+        settings = self._settings(guild_id)
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO guild_config (guild_id, key, value) VALUES (?, ?, ?)",
+                (guild_id, key, str(value))
+            )
+        self._changed(guild_id, settings, key, value)
+
+    def reset(self, guild_id, key):
+        settings = self._settings(guild_id)
+        with self.db:
+            self.db.execute("DELETE FROM guild_config WHERE guild_id = ? AND key = ?", (guild_id, key))
+        self._changed(guild_id, settings, key, self.defaults[key])
+
+    def _changed(self, guild_id, settings, key, value):
+        if settings[key] == value:
+            return
+        settings[key] = value
+        for listener in list(self._listeners):
+            listener(guild_id, key, value)
+
+    def subscribe(self, listener):
+        """
+        listener(guild_id, key, value) is called after a setting changes.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def forget(self, guild_id):
+        """
+        Drops the cached copy (e.g. when the bot leaves the guild). The stored settings stay.
+        """
+        self._cache.pop(guild_id, None)
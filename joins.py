@@ -0,0 +1,92 @@
+import asyncio
+import collections
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# JOIN BUFFER
+# ==============================================================================
+# Collects member joins per guild over a short window and hands them to one
+# flush callback, so a raid or invite wave produces one welcome message per
+# window instead of one per member. Also keeps a sliding join-rate counter that
+# can trigger a raid alert.
+
+
+class JoinBuffer:
+    """
+    on_flush(guild_id, members) is awaited once per window with every member who joined during it.
+    on_raid(guild_id, joins) is awaited when a guild reaches raid_threshold joins within rate_window seconds.
+    """
+    def __init__(self, window, on_flush, rate_window=60, raid_threshold=None, on_raid=None):
+        self.window = window
+        self.on_flush = on_flush
+        self.rate_window = rate_window
+        self.raid_threshold = raid_threshold
+        self.on_raid = on_raid
+
+        self._pending = {}       # guild_id -> [member, ...]
+        self._joins = collections.defaultdict(collections.deque)  # guild_id -> join timestamps
+        self._last_alert = {}    # guild_id -> time of the last raid alert
+        self._tasks = set()
+
+    def add(self, guild_id, member):
+        now = time.monotonic()
+        joins = self._joins[guild_id]
+        joins.append(now)
+        self._trim(joins, now)
+
+        if self.raid_threshold and self.on_raid and len(joins) >= self.raid_threshold:
+            # Alert at most once per rate window for the same guild
+            if now - self._last_alert.get(guild_id, float("-inf")) >= self.rate_window:
+                self._last_alert[guild_id] = now
+                self._spawn(self.on_raid(guild_id, len(joins)))
+
+        pending = self._pending.setdefault(guild_id, [])
+        pending.append(member)
+        if len(pending) == 1:
+            self._spawn(self._flush_later(guild_id))
+
+    def join_rate(self, guild_id):
+        """
+        Joins seen in the last rate_window seconds.
+        """
+        joins = self._joins.get(guild_id)
+        if not joins:
+            return 0
+        self._trim(joins, time.monotonic())
+        return len(joins)
+
+    def join_rates(self):
+        """
+        join_rate for every guild with joins in the window. A guild whose joins have all expired is
+        reported once more with 0, then dropped, so the map only holds guilds seeing joins.
+        """
+        now = time.monotonic()
+        rates = {}
+        for guild_id, joins in list(self._joins.items()):
+            self._trim(joins, now)
+            rates[guild_id] = len(joins)
+            if not joins:
+                del self._joins[guild_id]
+        return rates
+
+    def _trim(self, joins, now):
+        while joins and now - joins[0] > self.rate_window:
+            joins.popleft()
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_later(self, guild_id):
+        await asyncio.sleep(self.window)
+        members = self._pending.pop(guild_id, [])
+        if not members:
+            return
+        try:
+            await self.on_flush(guild_id, members)
+        except Exception:
+            log.exception("Error sending welcome for %s members", len(members), extra={"guild_id": guild_id})
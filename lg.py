@@ -1,300 +1,157 @@
 import discord
-from discord import app_commands
 from discord.ext import commands, tasks
 import asyncio
+import logging
+import time
+
+from config import (
+    ERROR_REPORT_CHANNEL_ID, ERROR_REPORT_LIMIT, ERROR_REPORT_WINDOW, EXTENSIONS, LOG_BACKUPS, LOG_LEVEL,
+    LOG_MAX_BYTES, LOG_PATH, MEMORY_PROFILE, METRICS_DUMP_INTERVAL, METRICS_DUMP_PATH, METRICS_PORT,
+    PRESENCE_ACTIVITIES, PRESENCE_INTERVAL, SHARD_COUNT, SHARD_IDS, SHARDED, TOKEN,
+)
+from core import metrics, outbound, ticket_store
+from logs import ErrorReporter, setup_logging
+from memory import memory_options
+from metrics import RateLimitWatcher, serve_prometheus
+from presence import PresenceRotator
+
+log = logging.getLogger("lifegiver")
 
 # ==============================================================================
-# CONFIGURATION
-# ==============================================================================
-TOKEN = "TOKENNNHEREEE" 
-
-# ID of the role to ping when a ticket is opened (e.g. SupportAdmins)
-# REPLACE THIS WITH THE ACTUAL ROLE ID FROM YOUR SERVER
-SUPPORT_ROLE_ID = 000000000000000000 
-
-# Global dictionary to track active disconnect timers
-disconnect_tasks = {}
-
-# ==============================================================================
-# HELPER FUNCTIONS
+# MAIN BOT CLASS
 # ==============================================================================
-def get_next_ticket_number(guild):
+class ShardEventCounter:
     """
-    Scans 'Life Support Tickets' and 'Closed Tickets' to find the next available number.
+    Counts guild events per shard in one-minute buckets, so the rate costs O(1) per event.
     """
-    cats = [
-        discord.utils.get(guild.categories, name="Life Support Tickets"), 
-        discord.utils.get(guild.categories, name="Closed Tickets")
-    ]
-    numbers = []
-    for cat in cats:
-        if cat:
-            for channel in cat.channels:
-                # Checks for format 'ticket-0000'
-                if channel.name.startswith("ticket-") and channel.name[7:].isdigit():
-                    numbers.append(int(channel.name[7:]))
-    
-    if not numbers:
-        return 1
-    return max(numbers) + 1
-
-# ==============================================================================
-# TICKET SYSTEM UI
-# ==============================================================================
-
-# We define CloseTicketView first so it is definitely available
-class CloseTicketView(discord.ui.View):
-    def __init__(self):
-        super().__init__(timeout=None)
-
-    @discord.ui.button(label="Close & Archive", style=discord.ButtonStyle.red, emoji="🔒", custom_id="ticket_close_btn")
-    async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
-        guild = interaction.guild
-        channel = interaction.channel
-        
-        await interaction.response.send_message("Archiving ticket...")
-        
-        # 1. Get or Create 'Closed Tickets' Category
-        closed_category = discord.utils.get(guild.categories, name="Closed Tickets")
-        if not closed_category:
-            # Create it privately
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(read_messages=False),
-                guild.me: discord.PermissionOverwrite(read_messages=True)
-            }
-            if SUPPORT_ROLE_ID != 0:
-                support_role = guild.get_role(SUPPORT_ROLE_ID)
-                if support_role:
-                    overwrites[support_role] = discord.PermissionOverwrite(read_messages=True)
-            
-            closed_category = await guild.create_category("Closed Tickets", overwrites=overwrites)
-
-        # 2. Move Channel and Sync Permissions
-        await channel.edit(category=closed_category, sync_permissions=True)
-        
-        # 3. Notify inside the channel
-        embed = discord.Embed(description="🔒 **Ticket Closed and Archived.**", color=discord.Color.red())
-        await channel.send(embed=embed)
-
-class TicketView(discord.ui.View):
     def __init__(self):
-        super().__init__(timeout=None)
-
-    @discord.ui.button(label="Open a Life Support Ticket", style=discord.ButtonStyle.green, emoji="🎟", custom_id="ticket_create_btn")
-    async def create_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
-        guild = interaction.guild
-        
-        # 1. Get or Create Category
-        category = discord.utils.get(guild.categories, name="Life Support Tickets")
-        if not category:
-            category = await guild.create_category("Life Support Tickets")
-
-        # 2. Determine Channel Name
-        next_num = get_next_ticket_number(guild)
-        channel_name = f"ticket-{next_num:04d}"
-
-        # 3. Set Permissions
-        # We give the bot extra permissions (embed_links) to ensure it can post the menu
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            interaction.user: discord.PermissionOverwrite(read_messages=True, send_messages=True),
-            guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True, embed_links=True, attach_files=True)
-        }
-
-        support_role_mention = ""
-        if SUPPORT_ROLE_ID != 0:
-            support_role = guild.get_role(SUPPORT_ROLE_ID)
-            if support_role:
-                overwrites[support_role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
-                support_role_mention = support_role.mention
-
-        # 4. Create Channel
-        ticket_channel = await guild.create_text_channel(name=channel_name, category=category, overwrites=overwrites)
-
-        await interaction.response.send_message(f"Your Life Support ticket has been opened: {ticket_channel.mention}", ephemeral=True)
-        
-        # 5. Send Ticket Message
-        embed = discord.Embed(
-            title=f"Life Support #{next_num:04d}", 
-            description="Please describe your issue. Support will be with you shortly.", 
-            color=discord.Color.green()
-        )
-        
-        content_msg = f"{interaction.user.mention} {support_role_mention}".strip()
-        
-        # Wrapped in try/except to catch errors if the message fails to send
-        try:
-            await ticket_channel.send(content=content_msg, embed=embed, view=CloseTicketView())
-        except Exception as e:
-            print(f"ERROR SENDING TICKET EMBED: {e}")
-            await ticket_channel.send(f"Ticket created, but I couldn't load the menu. Error: {e}")
-
-# ==============================================================================
-# MAIN BOT CLASS
-# ==============================================================================
-class LifeGiverBot(commands.Bot):
+        self._minute = {}   # shard_id -> minute the current bucket belongs to
+        self._current = {}  # shard_id -> events so far this minute
+        self._last = {}     # shard_id -> events in the previous full minute
+
+    def add(self, shard_id):
+        minute = int(time.monotonic() // 60)
+        if self._minute.get(shard_id) != minute:
+            # Only carry the bucket over if it was the minute right before this one
+            previous = self._current.get(shard_id, 0) if self._minute.get(shard_id) == minute - 1 else 0
+            self._last[shard_id] = previous
+            self._minute[shard_id] = minute
+            self._current[shard_id] = 0
+        self._current[shard_id] += 1
+
+    def per_minute(self, shard_id):
+        minute = int(time.monotonic() // 60)
+        bucket = self._minute.get(shard_id)
+        if bucket == minute:
+            return self._last.get(shard_id, 0)
+        if bucket == minute - 1:
+            return self._current.get(shard_id, 0)
+        return 0
+
+BotBase = commands.AutoShardedBot if SHARDED else commands.Bot
+
+class LifeGiverBot(BotBase):
     def __init__(self):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.members = True
-        super().__init__(command_prefix="!", intents=intents)
+        shard_options = {}
+        if SHARDED:
+            shard_options = {"shard_count": SHARD_COUNT, "shard_ids": SHARD_IDS}
+        super().__init__(command_prefix="!", intents=intents, **shard_options, **memory_options(MEMORY_PROFILE))
+        self.shard_events = ShardEventCounter()
+        self.presence = PresenceRotator(PRESENCE_ACTIVITIES, values=self.presence_values)
+
+    def dispatch(self, event_name, /, *args, **kwargs):
+        # Attribute guild events to the shard that delivered them
+        if args:
+            guild = args[0] if isinstance(args[0], discord.Guild) else getattr(args[0], "guild", None)
+            if isinstance(guild, discord.Guild):
+                self.shard_events.add(guild.shard_id)
+        super().dispatch(event_name, *args, **kwargs)
+
+    def shard_report(self):
+        """
+        Returns (shard_id, latency, guild count, events per minute) for every shard this process runs.
+        """
+        latencies = self.latencies if SHARDED else [(self.shard_id or 0, self.latency)]
+        guild_counts = {}
+        for guild in self.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+        return [
+            (shard_id, latency, guild_counts.get(shard_id, 0), self.shard_events.per_minute(shard_id))
+            for shard_id, latency in latencies
+        ]
 
     async def setup_hook(self):
-        self.add_view(TicketView())
-        self.add_view(CloseTicketView())
+        # Background messages queue up from here on; the workers pace them (see outbound.py)
+        outbound.start()
+        if ERROR_REPORT_CHANNEL_ID:
+            logging.getLogger().addHandler(ErrorReporter(
+                self, ERROR_REPORT_CHANNEL_ID, outbound, limit=ERROR_REPORT_LIMIT, window=ERROR_REPORT_WINDOW
+            ))
+        # Commands and their listeners are only imported now, one extension per group (see cogs/)
+        for extension in EXTENSIONS:
+            try:
+                with metrics.timer(f"startup.extension.{extension}"):
+                    await self.load_extension(extension)
+            except commands.ExtensionError:
+                # One broken command group should not take the rest of the bot down with it
+                log.exception("Failed to load extension %s", extension)
         self.status_loop.start()
-        print("Setup complete. Waiting for commands...")
+        # Time every REST call, the rate-limit bucket waits discord.py does for us and its 429 retries
+        metrics.wrap_http(self.http)
+        metrics.time_bucket_waits(discord.http.Ratelimit)
+        logging.getLogger("discord.http").addHandler(RateLimitWatcher(metrics))
+        self.metrics_dump_loop.start()
+        if METRICS_PORT:
+            self.metrics_server = await serve_prometheus(metrics, METRICS_PORT)
+        log.info("Setup complete. Waiting for commands...")
+
+    async def close(self):
+        # Stop sending queued background messages before the HTTP session goes away
+        outbound.stop()
+        await super().close()
 
     async def on_ready(self):
-        print(f'Logged in as {self.user} (ID: {self.user.id})')
-        print('Life Giver is active in Life Lounge.')
-
-    async def on_member_join(self, member):
-        channel = member.guild.system_channel
-        if channel:
-            embed = discord.Embed(
-                title="New Life Has Entered!",
-                description=f"Welcome to **Life Lounge**, {member.mention}! We are glad you are here.",
-                color=discord.Color.teal()
-            )
-            embed.set_thumbnail(url=member.display_avatar.url)
-            await channel.send(embed=embed)
-
-    @tasks.loop(seconds=30)
-    async def status_loop(self):
-        activities = [
-            discord.Activity(type=discord.ActivityType.watching, name="Life Lounge"),
-            discord.Game("Giving Life")
-        ]
-        for activity in activities:
-            await self.change_presence(activity=activity)
-            await asyncio.sleep(30)
-
-client = LifeGiverBot()
-
-# ==============================================================================
-# COMMANDS
-# ==============================================================================
-
-@client.command()
-async def sync(ctx):
-    try:
-        ctx.bot.tree.copy_global_to(guild=ctx.guild)
-        fmt = await ctx.bot.tree.sync(guild=ctx.guild)
-        await ctx.message.delete()
-        await ctx.send(f"✅ **Synced {len(fmt)} commands** to this server! You should see them now.")
-    except Exception as e:
-        await ctx.send(f"❌ Failed to sync: {e}")
-        
-@client.command(name="ping")
-async def ping(ctx):
-    latency = round(client.latency * 1000)
-    await ctx.send(f"🏓 **Pong!** Connection latency is {latency}ms.")
-
-@client.command(name="say")
-async def say(ctx, *, message):
-    if ctx.author.guild_permissions.administrator:
-        await ctx.message.delete() 
-        await ctx.send(message)
-    else:
-        await ctx.send("❌ You need Administration permission for this.", delete_after=5)
-
-@client.command(name="avatar")
-async def avatar(ctx, member: discord.Member = None):
-    member = member or ctx.author
-    embed = discord.Embed(title=f"{member.name}'s Avatar", color=discord.Color.purple())
-    embed.set_image(url=member.display_avatar.url)
-    await ctx.send(embed=embed)
-
-# SLASH COMMANDS
-@client.tree.command(name="disconnect", description="Disconnect a user from Voice after a specific time.")
-@app_commands.describe(member="Who to disconnect", seconds="Seconds to wait", minutes="Minutes to wait")
-async def disconnect(interaction: discord.Interaction, member: discord.Member, seconds: int = 0, minutes: int = 0):
-    is_admin = interaction.user.guild_permissions.administrator
-    is_self = interaction.user.id == member.id
-
-    if not is_self and not is_admin:
-        return await interaction.response.send_message("🚫 You can only disconnect yourself. Ask an Admin to disconnect others.", ephemeral=True)
-
-    if not member.voice:
-        return await interaction.response.send_message(f"{member.name} is not in a voice channel.", ephemeral=True)
-
-    total_seconds = seconds + (minutes * 60)
-    if total_seconds <= 0:
-        return await interaction.response.send_message("Please provide a valid time.", ephemeral=True)
-
-    if member.id in disconnect_tasks:
-        try:
-            disconnect_tasks[member.id].cancel()
-        except Exception:
-            pass
-        del disconnect_tasks[member.id]
-
-    async def perform_disconnect():
+        # A fresh gateway session starts without our activity
+        self.presence.forget()
+        log.info("Logged in as %s (ID: %s)", self.user, self.user.id)
+        log.info("Life Giver is active in Life Lounge.")
+
+    @tasks.loop(seconds=METRICS_DUMP_INTERVAL)
+    async def metrics_dump_loop(self):
+        # Snapshot on the loop (handlers keep adding timings), write in a thread
+        snapshot = metrics.snapshot()
         try:
-            await asyncio.sleep(total_seconds)
-            if member.voice:
-                await member.move_to(None)
-                try:
-                    await interaction.channel.send(f"✅ **{member.name}** has been disconnected (Timer Reached).")
-                except:
-                    pass
-        except asyncio.CancelledError:
-            pass 
-        except Exception as e:
-            print(f"Error disconnecting {member.name}: {e}")
-        finally:
-            if member.id in disconnect_tasks:
-                del disconnect_tasks[member.id]
-
-    task = asyncio.create_task(perform_disconnect())
-    disconnect_tasks[member.id] = task
-
-    embed = discord.Embed(
-        title="⏳ Timer Set", 
-        description=f"Disconnecting **{member.name}** in **{total_seconds}** seconds.\nUse `/cancel` to stop.", 
-        color=discord.Color.orange()
-    )
-    await interaction.response.send_message(embed=embed)
+            await asyncio.to_thread(metrics.dump, METRICS_DUMP_PATH, snapshot)
+        except OSError:
+            log.exception("Could not write metrics to %s", METRICS_DUMP_PATH)
 
-@client.tree.command(name="cancel", description="Cancel an active disconnect timer.")
-@app_commands.describe(member="Who to cancel the timer for")
-async def cancel(interaction: discord.Interaction, member: discord.Member):
-    is_admin = interaction.user.guild_permissions.administrator
-    is_self = interaction.user.id == member.id
+    async def on_shard_ready(self, shard_id):
+        self.presence.forget(shard_id)
 
-    if not is_self and not is_admin:
-        return await interaction.response.send_message("🚫 You can only cancel your own timers.", ephemeral=True)
+    def presence_values(self):
+        return {"open_tickets": ticket_store.open_total, "guilds": len(self.guilds)}
 
-    if member.id in disconnect_tasks:
-        task = disconnect_tasks[member.id]
-        task.cancel()
-        del disconnect_tasks[member.id]
-        await interaction.response.send_message(f"✅ Cancelled the disconnect timer for **{member.name}**.")
-    else:
-        await interaction.response.send_message(f"❌ No active timer found for **{member.name}**.", ephemeral=True)
+    @tasks.loop(seconds=PRESENCE_INTERVAL)
+    async def status_loop(self):
+        # One activity per tick; shards already showing it are skipped, the rest are staggered over the tick
+        sent, skipped = await self.presence.rotate(self, spread=PRESENCE_INTERVAL)
+        metrics.inc("presence.sent", sent)
+        metrics.inc("presence.skipped", skipped)
 
-@client.tree.command(name="setup_tickets", description="Spawns the Ticket System Panel")
-async def setup_tickets(interaction: discord.Interaction):
-    if not interaction.user.guild_permissions.administrator:
-        return await interaction.response.send_message("Admins only.", ephemeral=True)
-    
-    embed = discord.Embed(
-        title="Life Lounge Support", 
-        description="Click the button to get direct help from moderators.",
-        color=discord.Color.green()
-    )
-    await interaction.channel.send(embed=embed, view=TicketView())
-    await interaction.response.send_message("Ticket panel created!", ephemeral=True)
+    @status_loop.before_loop
+    async def before_status_loop(self):
+        # change_presence needs the gateway, so setup_hook can run without one
+        await self.wait_until_ready()
 
-@client.tree.command(name="clean", description="Cleans messages from the chat.")
-@app_commands.describe(amount="Number of messages to delete")
-async def clean(interaction: discord.Interaction, amount: int):
-    if not interaction.user.guild_permissions.manage_messages:
-        return await interaction.response.send_message("You cannot manage messages.", ephemeral=True)
-    
-    await interaction.response.defer(ephemeral=True) 
-    deleted = await interaction.channel.purge(limit=amount)
-    await interaction.followup.send(f"🧹 Swept away {len(deleted)} messages.", ephemeral=True)
+client = LifeGiverBot()
 
-client.run(TOKEN)
\ No newline at end of file
+if __name__ == "__main__":
+    # discord.py's loggers go through our pipeline instead of its own stderr handler
+    listener = setup_logging(LOG_PATH, LOG_MAX_BYTES, LOG_BACKUPS, level=LOG_LEVEL)
+    try:
+        client.run(TOKEN, log_handler=None)
+    finally:
+        listener.stop()
\ No newline at end of file
@@ -0,0 +1,167 @@
+import asyncio
+import collections
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+import discord
+from discord.ext import commands
+
+# ==============================================================================
+# LOGGING
+# ==============================================================================
+# Every log call only puts the record on a queue; a background thread does the
+# formatting and the writing: JSON lines to a size-rotated file plus a short
+# line on stdout. discord.py's own loggers go through the same pipeline, so a
+# slow disk or terminal never holds up the event loop.
+#
+# Records logged while handling an interaction or prefix command carry its id
+# as `correlation_id`, so everything one click caused can be grepped together.
+# Errors can additionally be posted to an admin channel (see ErrorReporter).
+
+correlation_id = contextvars.ContextVar("correlation_id", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from `extra=` and is logged as a field
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "correlation_id"}
+
+
+def correlate(args):
+    """
+    Tags the current task with the id of the interaction (or the message of the prefix command)
+    among a handler's arguments. Left set for the rest of the task, so discord.py's own error
+    logging for the same command carries it too.
+    """
+    for arg in args:
+        if isinstance(arg, discord.Interaction):
+            correlation_id.set(arg.id)
+            return
+        if isinstance(arg, commands.Context):
+            correlation_id.set(arg.message.id)
+            return
+
+
+def fields(record):
+    return {key: value for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "correlation_id", None):
+            entry["correlation_id"] = record.correlation_id
+        entry.update(fields(record))
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """
+    Runs in the logging thread (usually the event loop): resolves the message, the traceback text
+    and the correlation id, which all depend on that thread, and leaves the rest to the writer.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.correlation_id = correlation_id.get()
+        return record
+
+
+def setup_logging(path, max_bytes, backups, level="INFO"):
+    """
+    Routes the root logger through a queue to a rotating JSON-lines file and stdout.
+    Returns the started QueueListener; stop() it on shutdown to flush what is still queued.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(asctime)s %(levelname)-8s %(name)s: %(message)s", "%Y-%m-%d %H:%M:%S"))
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, file_handler, console)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(LogQueueHandler(records))
+    listener.start()
+    return listener
+
+
+class ErrorReporter(logging.Handler):
+    """
+    Posts ERROR records to an admin channel through the outbound queue, at most `limit` per `window`
+    seconds. Errors over the limit are only counted and mentioned in the next report that goes out.
+    """
+    def __init__(self, bot, channel_id, outbound, limit=5, window=60.0):
+        super().__init__(level=logging.ERROR)
+        self.bot = bot
+        self.channel_id = channel_id
+        self.outbound = outbound
+        self.limit = limit
+        self.window = window
+        self.loop = asyncio.get_running_loop()
+        self.suppressed = 0
+        self._sent = collections.deque()  # times of recent reports
+        self._tasks = set()
+
+    def emit(self, record):
+        # May be called from any thread; everything else happens on the event loop
+        if record.name == __name__:
+            return
+        # After client.run returns (e.g. an error logged during shutdown) there is no loop left to post from
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self._schedule, record, correlation_id.get())
+
+    def _schedule(self, record, correlation):
+        now = time.monotonic()
+        while self._sent and now - self._sent[0] >= self.window:
+            self._sent.popleft()
+        if len(self._sent) >= self.limit:
+            self.suppressed += 1
+            return
+        self._sent.append(now)
+        suppressed, self.suppressed = self.suppressed, 0
+        task = asyncio.create_task(self._report(record, correlation, suppressed))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _report(self, record, correlation, suppressed):
+        # Errors during startup are posted once the channel can be seen
+        await self.bot.wait_until_ready()
+        channel = self.bot.get_channel(self.channel_id)
+        if channel is None:
+            return
+
+        description = record.getMessage()
+        if record.exc_info:
+            description += "\n" + logging.Formatter().formatException(record.exc_info)
+        # Embed descriptions hold at most 4096 characters; keep the end of the traceback
+        if len(description) > 4000:
+            description = "…" + description[-3999:]
+        embed = discord.Embed(title=f"⚠️ Error in {record.name}", description=f"```\n{description}\n```", color=discord.Color.red())
+        footer = f"correlation id {correlation}" if correlation else "no correlation id"
+        if suppressed:
+            footer += f" • {suppressed} more error(s) not reported since the last one"
+        embed.set_footer(text=footer)
+        try:
+            await self.outbound.send(channel, embed=embed)
+        except discord.HTTPException as e:
+            logging.getLogger(__name__).warning("Could not post an error report: %s", e)
@@ -0,0 +1,30 @@
+import discord
+
+# ==============================================================================
+# MEMORY PROFILES
+# ==============================================================================
+# "default" keeps discord.py's normal caching: every member (chunked at startup)
+# and the last 1000 messages.
+# "lean" only caches members who are in voice (for /disconnect) or who joined
+# while the bot was running, keeps a small message cache and skips chunking.
+# Anything else is fetched lazily when a handler needs it.
+
+LEAN_MAX_MESSAGES = 100
+
+
+def memory_options(profile):
+    """
+    Returns the discord.Client keyword arguments for a memory profile.
+    """
+    if profile == "default":
+        return {}
+    if profile == "lean":
+        member_cache_flags = discord.MemberCacheFlags.none()
+        member_cache_flags.voice = True
+        member_cache_flags.joined = True
+        return {
+            "member_cache_flags": member_cache_flags,
+            "max_messages": LEAN_MAX_MESSAGES,
+            "chunk_guilds_at_startup": False,
+        }
+    raise ValueError(f"Unknown memory profile: {profile!r}")
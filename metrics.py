@@ -0,0 +1,206 @@
+import collections
+import contextlib
+import functools
+import json
+import logging
+import time
+
+from logs import correlate
+
+# ==============================================================================
+# METRICS
+# ==============================================================================
+# In-process counters and timings for commands, views, their individual steps
+# and Discord HTTP calls. Read by /stats, dumped to JSON periodically and
+# optionally served in Prometheus text format.
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Timing:
+    """
+    Count, total and max since startup, plus a window of recent samples for percentiles.
+    """
+    def __init__(self, samples):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = collections.deque(maxlen=samples)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def percentile(self, q):
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    def to_dict(self):
+        data = {"count": self.count, "total": self.total, "max": self.max}
+        for q in QUANTILES:
+            data[f"p{int(q * 100)}"] = self.percentile(q)
+        return data
+
+
+class Metrics:
+    def __init__(self, samples=500):
+        self.samples = samples
+        self.counters = collections.Counter()
+        self.gauges = {}
+        self.timings = {}
+        self.started = time.time()
+
+    def inc(self, name, amount=1):
+        self.counters[name] += amount
+
+    def gauge(self, name, value):
+        """
+        Current level of something (e.g. a queue depth), as opposed to a running count.
+        """
+        self.gauges[name] = value
+
+    def observe(self, name, seconds):
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing(self.samples)
+        timing.add(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """
+        Times one step: `with metrics.timer("create_ticket.channel_create"): ...`. Errors are counted, then re-raised.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{name}.errors")
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def traced(self, name):
+        """
+        Decorator timing a whole command or view callback under `name`, and tagging its logs with
+        the interaction's correlation id. The signature is preserved so discord.py still sees the original parameters.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                correlate(args)
+                self.inc(f"{name}.calls")
+                with self.timer(name):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def wrap_http(self, http):
+        """
+        Times every Discord REST call by route template (e.g. "POST /channels/{channel_id}/messages").
+        """
+        request = http.request
+
+        async def timed_request(route, **kwargs):
+            with self.timer(f"http {route.method} {route.path}"):
+                return await request(route, **kwargs)
+
+        http.request = timed_request
+
+    def time_bucket_waits(self, ratelimit_class):
+        """
+        Times the waits discord.py does before a request, on its own per-route buckets (pass discord.http.Ratelimit):
+        acquire blocks while a bucket is empty, and leaving it sleeps out the reset when the request used the
+        last token. Only the 429 retries show up in its logs (see RateLimitWatcher).
+        """
+        if getattr(ratelimit_class, "_timed", False):
+            return
+        acquire, release = ratelimit_class.acquire, ratelimit_class.__aexit__
+
+        async def timed_acquire(bucket):
+            started = time.perf_counter()
+            await acquire(bucket)
+            self._bucket_wait(time.perf_counter() - started)
+
+        async def timed_release(bucket, *exc_info):
+            started = time.perf_counter()
+            await release(bucket, *exc_info)
+            self._bucket_wait(time.perf_counter() - started)
+
+        ratelimit_class.acquire, ratelimit_class.__aexit__ = timed_acquire, timed_release
+        ratelimit_class._timed = True
+
+    def _bucket_wait(self, seconds):
+        # Anything under a millisecond went straight through
+        if seconds >= 0.001:
+            self.observe("ratelimit.bucket_wait", seconds)
+
+    def snapshot(self):
+        return {
+            "uptime": time.time() - self.started,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "timings": {name: timing.to_dict() for name, timing in self.timings.items()},
+        }
+
+    def dump(self, path, snapshot=None):
+        """
+        Writes snapshot (default: a fresh one) as JSON. Take the snapshot on the event loop and pass it in
+        when writing from a thread: the loop adds new timing names at any time.
+        """
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2)
+
+    def to_prometheus(self, prefix="lifegiver"):
+        lines = [f"# TYPE {prefix}_events_total counter"]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+        lines.append(f"# TYPE {prefix}_level gauge")
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f'{prefix}_level{{name="{name}"}} {value}')
+        lines.append(f"# TYPE {prefix}_duration_seconds summary")
+        for name, timing in sorted(self.timings.items()):
+            for q in QUANTILES:
+                lines.append(f'{prefix}_duration_seconds{{name="{name}",quantile="{q}"}} {timing.percentile(q):.6f}')
+            lines.append(f'{prefix}_duration_seconds_sum{{name="{name}"}} {timing.total:.6f}')
+            lines.append(f'{prefix}_duration_seconds_count{{name="{name}"}} {timing.count}')
+        return "\n".join(lines) + "\n"
+
+
+class RateLimitWatcher(logging.Handler):
+    """
+    discord.py sleeps out 429 responses itself and only reports them through the discord.http logger.
+    This handler turns those warnings into ratelimit.* metrics.
+    """
+    def __init__(self, metrics):
+        super().__init__(level=logging.WARNING)
+        self.metrics = metrics
+
+    def emit(self, record):
+        message = str(record.msg)
+        if "responded with 429" in message and "Retrying in" in message:
+            self.metrics.inc("ratelimit.hits")
+            self.metrics.observe("ratelimit.wait", float(record.args[-1]))
+        elif message.startswith("Global rate limit has been hit"):
+            self.metrics.inc("ratelimit.global")
+
+
+async def serve_prometheus(metrics, port):
+    """
+    Serves GET /metrics on localhost. aiohttp already ships with discord.py.
+    """
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(text=metrics.to_prometheus(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
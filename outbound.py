@@ -0,0 +1,201 @@
+import asyncio
+import collections
+import time
+
+# ==============================================================================
+# OUTBOUND MESSAGE QUEUE
+# ==============================================================================
+# Background channel messages (welcome embeds, disconnect summaries, archive
+# and stale-ticket notices, ticket menus) go through here instead of calling
+# channel.send directly. Every message respects `route_limit` sends per channel
+# per `route_window`, highest priority first. Normal and low priority traffic
+# also shares a budget of `rate` sends per second, so bulk traffic can never
+# use up the rate-limit budget that interaction responses and command replies
+# need. Those still call Discord directly and never wait in this queue; high
+# priority messages (someone is waiting on them) skip the shared budget.
+#
+# A notice sent with a `coalesce` key replaces a queued one with the same key
+# instead of going out twice. When more than `max_pending` messages are queued,
+# the oldest low-priority ones are dropped.
+
+HIGH = "high"
+NORMAL = "normal"
+LOW = "low"
+PRIORITIES = (HIGH, NORMAL, LOW)
+
+
+class Pending:
+    __slots__ = ("channel", "kwargs", "priority", "key", "future", "queued_at")
+
+    def __init__(self, channel, kwargs, priority, key, future):
+        self.channel = channel
+        self.kwargs = kwargs
+        self.priority = priority
+        self.key = key
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+class OutboundQueue:
+    def __init__(self, metrics, rate=25, route_limit=5, route_window=5.0, workers=4, max_pending=500):
+        self.metrics = metrics
+        self.rate = rate
+        self.route_limit = route_limit
+        self.route_window = route_window
+        self.workers = workers
+        self.max_pending = max_pending
+
+        self._queues = {priority: collections.deque() for priority in PRIORITIES}
+        self._by_key = {}                                        # coalesce key -> queued Pending
+        self._routes = collections.defaultdict(collections.deque)  # channel_id -> recent send times
+        self._tokens = float(rate)
+        self._refilled = time.monotonic()
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+
+    def __len__(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def stop(self):
+        """
+        Cancels the workers. Messages still queued or being sent are dropped, so nobody waits on them forever.
+        """
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for queue in self._queues.values():
+            while queue:
+                entry = self._forget(queue.popleft())
+                if not entry.future.done():
+                    entry.future.set_result(None)
+        self._report_depth()
+
+    def send(self, channel, *, priority=NORMAL, coalesce=None, **kwargs):
+        """
+        Queues channel.send(**kwargs). Returns a future for the sent Message, or None if it was dropped.
+        """
+        if coalesce is not None:
+            queued = self._by_key.get(coalesce)
+            if queued is not None:
+                # Same notice still waiting: send the newest version once
+                queued.kwargs = kwargs
+                self.metrics.inc("outbound.coalesced")
+                return queued.future
+
+        future = asyncio.get_running_loop().create_future()
+        if len(self) >= self.max_pending:
+            if priority == LOW:
+                self.metrics.inc("outbound.dropped")
+                future.set_result(None)
+                return future
+            # Make room at the expense of low-priority traffic; higher priorities are never dropped
+            self._shed()
+
+        entry = Pending(channel, kwargs, priority, coalesce, future)
+        self._queues[priority].append(entry)
+        if coalesce is not None:
+            self._by_key[coalesce] = entry
+        self._report_depth()
+        self._wakeup.set()
+        return future
+
+    def _shed(self):
+        """
+        Drops the oldest low-priority message, if there is one, to make room.
+        """
+        queue = self._queues[LOW]
+        if queue:
+            self._forget(queue.popleft()).future.set_result(None)
+            self.metrics.inc("outbound.dropped")
+
+    def _forget(self, entry):
+        if entry.key is not None and self._by_key.get(entry.key) is entry:
+            del self._by_key[entry.key]
+        return entry
+
+    def _report_depth(self):
+        for priority, queue in self._queues.items():
+            self.metrics.gauge(f"outbound.pending.{priority}", len(queue))
+
+    def _refill(self, now):
+        self._tokens = min(self.rate, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _route_free_at(self, route, now):
+        """
+        0 if the channel has budget left, otherwise how many seconds until it does.
+        """
+        sent = self._routes.get(route)
+        if not sent:
+            return 0
+        while sent and now - sent[0] >= self.route_window:
+            sent.popleft()
+        if not sent:
+            # Quiet channel: drop its history so the map only holds recently used channels
+            del self._routes[route]
+            return 0
+        if len(sent) < self.route_limit:
+            return 0
+        return sent[0] + self.route_window - now
+
+    def _take(self, now, budget):
+        # Highest priority first; within it, the oldest message whose channel still has room
+        for priority in PRIORITIES:
+            if priority != HIGH and not budget:
+                break
+            queue = self._queues[priority]
+            for index, entry in enumerate(queue):
+                if self._route_free_at(entry.channel.id, now) == 0:
+                    del queue[index]
+                    return self._forget(entry)
+        return None
+
+    def _next_delay(self, now):
+        """
+        Seconds until some queued message could go out, None if the queue is empty.
+        """
+        token_wait = max((1 - self._tokens) / self.rate, 0)
+        delays = [
+            max(self._route_free_at(entry.channel.id, now), 0 if priority == HIGH else token_wait)
+            for priority, queue in self._queues.items() for entry in queue
+        ]
+        return min(delays) if delays else None
+
+    async def _next(self):
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            entry = self._take(now, budget=self._tokens >= 1)
+            if entry is not None:
+                if entry.priority != HIGH:
+                    self._tokens -= 1
+                self._routes[entry.channel.id].append(now)
+                self._report_depth()
+                return entry
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_delay(now))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            entry = await self._next()
+            self.metrics.observe(f"outbound.wait.{entry.priority}", time.monotonic() - entry.queued_at)
+            try:
+                with self.metrics.timer("outbound.send"):
+                    message = await entry.channel.send(**entry.kwargs)
+            except Exception as e:
+                if not entry.future.done():
+                    entry.future.set_exception(e)
+            else:
+                self.metrics.inc(f"outbound.sent.{entry.priority}")
+                if not entry.future.done():
+                    entry.future.set_result(message)
+            finally:
+                # Cancelled by stop() in the middle of the send: counts as dropped
+                if not entry.future.done():
+                    entry.future.set_result(None)
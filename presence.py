@@ -0,0 +1,78 @@
+import asyncio
+import logging
+
+import discord
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# PRESENCE ROTATION
+# ==============================================================================
+# One activity per tick, taken in turn from a configured list. Text can hold
+# placeholders filled from counters the bot already keeps. A shard only gets a
+# presence update if what it shows would change, and when several shards need
+# one the updates are spaced out instead of all going out at once.
+
+ACTIVITY_TYPES = {
+    "playing": discord.ActivityType.playing,
+    "watching": discord.ActivityType.watching,
+    "listening": discord.ActivityType.listening,
+    "competing": discord.ActivityType.competing,
+}
+
+
+class PresenceRotator:
+    """
+    activities: [(type, text), ...] with type a key of ACTIVITY_TYPES, e.g. ("watching", "{open_tickets} open tickets").
+    values() returns the placeholder values; it is only called when the next activity has placeholders.
+    """
+    def __init__(self, activities, values):
+        self.activities = [(ACTIVITY_TYPES[kind], text) for kind, text in activities]
+        self.values = values
+        self._index = 0
+        self._shown = {}  # shard_id (None when not sharded) -> (type, text) last sent there
+
+    def next_presence(self):
+        kind, text = self.activities[self._index % len(self.activities)]
+        self._index += 1
+        if "{" in text:
+            text = text.format(**self.values())
+        return kind, text
+
+    def forget(self, shard_id=None):
+        """
+        Call when a shard (re)identifies: Discord drops its presence, so the next tick must resend it.
+        """
+        if shard_id is None:
+            self._shown.clear()
+        else:
+            self._shown.pop(shard_id, None)
+
+    async def rotate(self, bot, spread):
+        """
+        Moves to the next activity and sends it to every shard not already showing it,
+        spacing those updates evenly over `spread` seconds. Returns (sent, skipped).
+        """
+        if not self.activities:
+            return 0, 0
+        presence = self.next_presence()
+        shard_ids = sorted(bot.shards) if isinstance(bot, discord.AutoShardedClient) else [None]
+        stale = [shard_id for shard_id in shard_ids if self._shown.get(shard_id) != presence]
+
+        sent = 0
+        for position, shard_id in enumerate(stale):
+            if position:
+                await asyncio.sleep(spread / len(stale))
+            activity = discord.Activity(type=presence[0], name=presence[1])
+            try:
+                if shard_id is None:
+                    await bot.change_presence(activity=activity)
+                else:
+                    await bot.change_presence(activity=activity, shard_id=shard_id)
+            except Exception as e:
+                # Usually a shard that is reconnecting; it gets the presence on the next tick
+                log.warning("Error updating presence on shard %s: %s", shard_id, e)
+                continue
+            self._shown[shard_id] = presence
+            sent += 1
+        return sent, len(shard_ids) - len(stale)
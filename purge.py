@@ -0,0 +1,124 @@
+import asyncio
+import datetime
+import logging
+import time
+
+import discord
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# PURGE ENGINE
+# ==============================================================================
+# Streams a channel's history once, newest first. Messages younger than 14 days
+# are bulk-deleted in batches of 100; older ones need one DELETE each and go
+# through a small pool of workers. discord.py already waits out the per-route
+# rate-limit buckets, so the pool only limits how many deletes queue up behind
+# the same bucket at once.
+
+BULK_DELETE_BATCH = 100
+# Discord rejects bulk deletes of messages older than 14 days; keep a safety margin
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)
+
+
+class PurgeStats:
+    def __init__(self):
+        self.scanned = 0
+        self.deleted = 0
+        self.failed = 0
+
+    def __str__(self):
+        text = f"scanned {self.scanned}, deleted {self.deleted}"
+        if self.failed:
+            text += f", failed {self.failed}"
+        return text
+
+
+def build_check(author=None, contains=None, bots_only=False):
+    """
+    Combines the /clean filters into one predicate, applied to each message as it streams in.
+    """
+    needle = contains.lower() if contains else None
+
+    def check(message):
+        if author is not None and message.author.id != author.id:
+            return False
+        if bots_only and not message.author.bot:
+            return False
+        if needle is not None and needle not in message.content.lower():
+            return False
+        return True
+
+    return check
+
+
+async def purge_messages(channel, limit, check=None, on_progress=None, workers=2, progress_interval=2.0):
+    """
+    Searches up to `limit` messages and deletes every one that passes `check`.
+    `on_progress(stats)` is awaited at most once per `progress_interval` seconds and once at the end.
+    """
+    stats = PurgeStats()
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    # Bounded so history streaming pauses while the old-message deletes catch up
+    old_messages = asyncio.Queue(maxsize=BULK_DELETE_BATCH)
+    last_report = time.monotonic()
+
+    async def delete_worker():
+        while True:
+            message = await old_messages.get()
+            try:
+                await message.delete()
+                stats.deleted += 1
+            except discord.NotFound:
+                pass
+            except discord.HTTPException:
+                stats.failed += 1
+            finally:
+                old_messages.task_done()
+            await report()
+
+    async def bulk_delete(batch):
+        try:
+            await channel.delete_messages(batch)
+            stats.deleted += len(batch)
+        except discord.HTTPException:
+            stats.failed += len(batch)
+
+    async def report(force=False):
+        nonlocal last_report
+        if on_progress is None:
+            return
+        now = time.monotonic()
+        if force or now - last_report >= progress_interval:
+            last_report = now
+            try:
+                await on_progress(stats)
+            except discord.HTTPException as e:
+                # Only the progress message failed; the purge itself carries on
+                log.warning("Could not update purge progress in %s: %s", channel.name, e)
+
+    pool = [asyncio.create_task(delete_worker()) for _ in range(workers)]
+    batch = []
+    try:
+        async for message in channel.history(limit=limit):
+            stats.scanned += 1
+            if check is not None and not check(message):
+                continue
+            if message.created_at > cutoff:
+                batch.append(message)
+                if len(batch) == BULK_DELETE_BATCH:
+                    await bulk_delete(batch)
+                    batch = []
+            else:
+                await old_messages.put(message)
+            await report()
+
+        if batch:
+            await bulk_delete(batch)
+        await old_messages.join()
+    finally:
+        for worker in pool:
+            worker.cancel()
+
+    await report(force=True)
+    return stats
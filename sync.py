@@ -0,0 +1,56 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+# ==============================================================================
+# APP-COMMAND SYNC CACHE
+# ==============================================================================
+# Syncing the command tree to a guild is one of the most tightly rate-limited
+# calls Discord has. We hash exactly the payload tree.sync() would upload and
+# remember, per guild, the hash that was last pushed, so !sync only calls
+# Discord when a command was actually added, removed or changed.
+
+
+def tree_hash(tree, guild):
+    """
+    SHA-256 of the guild's command payload, independent of registration order.
+    """
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CommandSyncCache:
+    """
+    guild_id -> hash of the command tree last synced there, kept in SQLite across restarts.
+    """
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS command_sync ("
+            "guild_id INTEGER PRIMARY KEY, tree_hash TEXT NOT NULL, synced_at REAL NOT NULL)"
+        )
+        self.db.commit()
+        self._hashes = dict(self.db.execute("SELECT guild_id, tree_hash FROM command_sync"))
+
+    def is_current(self, guild_id, digest):
+        return self._hashes.get(guild_id) == digest
+
+    def mark_synced(self, guild_id, digest):
+        self._hashes[guild_id] = digest
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO command_sync (guild_id, tree_hash, synced_at) VALUES (?, ?, ?)",
+                (guild_id, digest, time.time())
+            )
+
+    def forget(self, guild_id):
+        """
+        Drops the stored hash, e.g. when the bot leaves the guild and its commands can no longer be vouched for.
+        """
+        self._hashes.pop(guild_id, None)
+        with self.db:
+            self.db.execute("DELETE FROM command_sync WHERE guild_id = ?", (guild_id,))
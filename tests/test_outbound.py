@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from metrics import Metrics
+from outbound import HIGH, LOW, NORMAL, OutboundQueue
+
+
+class FakeChannel:
+    def __init__(self, channel_id, sent):
+        self.id = channel_id
+        self.sent = sent
+
+    async def send(self, **kwargs):
+        self.sent.append((self.id, kwargs))
+        return kwargs
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_high_priority_skips_the_shared_budget():
+    async def scenario():
+        sent = []
+        queue = OutboundQueue(Metrics(), rate=1, route_limit=100, route_window=1, workers=1)
+        normal = [queue.send(FakeChannel(i, sent), content=f"normal {i}") for i in range(3)]
+        high = [queue.send(FakeChannel(10 + i, sent), content=f"high {i}", priority=HIGH) for i in range(3)]
+        queue.start()
+        # Three sends inside 0.5 s would need 2 s of a 1/s budget if high priority spent it
+        await asyncio.wait_for(asyncio.gather(*high), 0.5)
+        queue.stop()
+        return sent, normal
+
+    sent, normal = run(scenario())
+    contents = [kwargs["content"] for _, kwargs in sent]
+    # Highest priority first, and only one normal message fits the 1/s budget in that time
+    assert contents[:3] == ["high 0", "high 1", "high 2"]
+    assert contents.count("normal 0") + contents.count("normal 1") + contents.count("normal 2") <= 1
+    assert all(future.done() for future in normal)
+
+
+def test_channel_budget_applies_to_every_priority():
+    async def scenario():
+        sent = []
+        queue = OutboundQueue(Metrics(), rate=100, route_limit=2, route_window=60, workers=2)
+        channel = FakeChannel(1, sent)
+        for i in range(3):
+            queue.send(channel, content=str(i), priority=HIGH)
+        queue.start()
+        await asyncio.sleep(0.2)
+        queue.stop()
+        return sent
+
+    assert len(run(scenario())) == 2
+
+
+def test_full_queue_sheds_low_priority():
+    async def scenario():
+        metrics = Metrics()
+        queue = OutboundQueue(metrics, max_pending=2)
+        channel = FakeChannel(1, [])
+        oldest = queue.send(channel, content="a", priority=LOW)
+        queue.send(channel, content="b", priority=LOW)
+        dropped = queue.send(channel, content="c", priority=LOW)
+        kept = queue.send(channel, content="d", priority=NORMAL)
+        assert len(queue) == 2
+        assert dropped.result() is None
+        assert oldest.result() is None
+        assert not kept.done()
+        assert metrics.counters["outbound.dropped"] == 2
+        queue.stop()
+        assert kept.result() is None
+
+    run(scenario())
+
+
+def test_duplicate_notice_is_coalesced():
+    async def scenario():
+        sent = []
+        metrics = Metrics()
+        queue = OutboundQueue(metrics)
+        channel = FakeChannel(1, sent)
+        first = queue.send(channel, content="old", coalesce=("stale", 1))
+        second = queue.send(channel, content="new", coalesce=("stale", 1))
+        assert first is second
+        assert len(queue) == 1
+        queue.start()
+        message = await asyncio.wait_for(first, 1)
+        queue.stop()
+        return sent, message, metrics
+
+    sent, message, metrics = run(scenario())
+    assert sent == [(1, {"content": "new"})]
+    assert message == {"content": "new"}
+    assert metrics.counters["outbound.coalesced"] == 1
+
+
+def test_stop_resolves_a_send_in_progress():
+    class HangingChannel(FakeChannel):
+        async def send(self, **kwargs):
+            await asyncio.Event().wait()
+
+    async def scenario():
+        queue = OutboundQueue(Metrics(), workers=1)
+        future = queue.send(HangingChannel(1, []), content="stuck", priority=HIGH)
+        queue.start()
+        await asyncio.sleep(0.05)
+        queue.stop()
+        return await asyncio.wait_for(future, 1)
+
+    assert run(scenario()) is None
@@ -0,0 +1,369 @@
+import asyncio
+import collections
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import time
+
+import discord
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# TICKET INDEX AND RESOURCES
+# ==============================================================================
+# The SQLite ticket index, the per-guild cache of categories/roles/overwrites
+# and the transcript export used when a ticket is closed.
+
+OPENER_OVERWRITE = discord.PermissionOverwrite(read_messages=True, send_messages=True)
+
+
+class TicketStore:
+    """
+    Persistent per-guild ticket counter and index (ticket number -> channel, opener, state).
+    Numbers are handed out straight from SQLite, so two clicks at the same moment never share one.
+    """
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            "guild_id INTEGER PRIMARY KEY, next_number INTEGER NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS tickets ("
+            "guild_id INTEGER NOT NULL, number INTEGER NOT NULL, channel_id INTEGER UNIQUE, "
+            "opener_id INTEGER, state TEXT NOT NULL DEFAULT 'open', "
+            "opened_at REAL, closed_at REAL, transcript_path TEXT, PRIMARY KEY (guild_id, number))"
+        )
+        # Databases created before transcripts / stale warnings existed lack these columns
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(tickets)")]
+        for column, kind in (("transcript_path", "TEXT"), ("warning_id", "INTEGER")):
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE tickets ADD COLUMN {column} {kind}")
+        self.db.execute("CREATE INDEX IF NOT EXISTS tickets_by_opener ON tickets (guild_id, opener_id, state)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS tickets_by_state ON tickets (state)")
+        self.db.commit()
+        self._count_open()
+
+    def _count_open(self):
+        """
+        Open tickets per guild, counted once here and then kept up to date by open/close,
+        so readers like the presence rotation never query for it.
+        """
+        self.open_counts = collections.Counter(dict(self.db.execute(
+            "SELECT guild_id, COUNT(*) FROM tickets WHERE state = 'open' GROUP BY guild_id"
+        ).fetchall()))
+        self.open_total = sum(self.open_counts.values())
+
+    def has_guild(self, guild_id):
+        return self.db.execute("SELECT 1 FROM counters WHERE guild_id = ?", (guild_id,)).fetchone() is not None
+
+    def allocate(self, guild_id):
+        """
+        Reserves the next ticket number for a guild. O(1), no channel scans.
+        """
+        with self.db:
+            self.db.execute(
+                "INSERT INTO counters (guild_id, next_number) VALUES (?, 2) "
+                "ON CONFLICT(guild_id) DO UPDATE SET next_number = next_number + 1",
+                (guild_id,)
+            )
+            row = self.db.execute("SELECT next_number FROM counters WHERE guild_id = ?", (guild_id,)).fetchone()
+        return row[0] - 1
+
+    def open(self, guild_id, number, channel_id, opener_id):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO tickets (guild_id, number, channel_id, opener_id, state, opened_at) "
+                "VALUES (?, ?, ?, ?, 'open', ?)",
+                (guild_id, number, channel_id, opener_id, time.time())
+            )
+        self.open_counts[guild_id] += 1
+        self.open_total += 1
+
+    def close(self, channel_id, transcript_path=None):
+        with self.db:
+            row = self.db.execute("SELECT guild_id, state FROM tickets WHERE channel_id = ?", (channel_id,)).fetchone()
+            self.db.execute(
+                "UPDATE tickets SET state = 'closed', closed_at = ?, "
+                "transcript_path = COALESCE(?, transcript_path) WHERE channel_id = ?",
+                (time.time(), transcript_path, channel_id)
+            )
+        if row and row["state"] == "open":
+            self.open_counts[row["guild_id"]] -= 1
+            self.open_total -= 1
+
+    def get_by_channel(self, channel_id):
+        return self.db.execute(
+            "SELECT guild_id, number, channel_id, opener_id, state, opened_at, closed_at, transcript_path "
+            "FROM tickets WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+
+    def open_ticket_for(self, guild_id, opener_id):
+        return self.db.execute(
+            "SELECT guild_id, number, channel_id, opener_id, state, opened_at, closed_at, transcript_path "
+            "FROM tickets WHERE guild_id = ? AND opener_id = ? AND state = 'open' "
+            "ORDER BY number DESC LIMIT 1", (guild_id, opener_id)
+        ).fetchone()
+
+    def open_tickets(self):
+        """
+        Every open ticket with its pending stale warning, straight from the index.
+        """
+        return self.db.execute(
+            "SELECT guild_id, number, channel_id, opener_id, opened_at, warning_id "
+            "FROM tickets WHERE state = 'open'"
+        ).fetchall()
+
+    def set_warning(self, channel_id, message_id):
+        """
+        Remembers the stale warning posted in a ticket (None clears it once someone replies).
+        """
+        with self.db:
+            self.db.execute("UPDATE tickets SET warning_id = ? WHERE channel_id = ?", (message_id, channel_id))
+
+    def get_by_number(self, guild_id, number):
+        return self.db.execute(
+            "SELECT guild_id, number, channel_id, opener_id, state, opened_at, closed_at, transcript_path "
+            "FROM tickets WHERE guild_id = ? AND number = ?", (guild_id, number)
+        ).fetchone()
+
+    def rebuild(self, guild, resources):
+        """
+        Scans the guild's ticket and closed categories once and re-seeds the counter and index.
+        Only used at startup for unknown guilds or on demand via !reindex.
+        """
+        highest = 0
+        categories = (
+            (resources.config.get(guild.id, "ticket_category"), "open"),
+            (resources.config.get(guild.id, "closed_category"), "closed"),
+        )
+        with self.db:
+            for cat_name, state in categories:
+                cat = resources.category(guild, cat_name)
+                if not cat:
+                    continue
+                for channel in cat.channels:
+                    # Checks for format 'ticket-0000'
+                    if not (channel.name.startswith("ticket-") and channel.name[7:].isdigit()):
+                        continue
+                    number = int(channel.name[7:])
+                    highest = max(highest, number)
+                    # The opener is the only member with its own overwrite (besides the bot).
+                    # Uncached members show up as discord.Object, so exclude roles rather than match members.
+                    opener_id = next(
+                        (target.id for target in channel.overwrites
+                         if not isinstance(target, discord.Role) and target.id != guild.me.id),
+                        None
+                    )
+                    self.db.execute(
+                        "INSERT INTO tickets (guild_id, number, channel_id, opener_id, state, opened_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(guild_id, number) DO UPDATE SET channel_id = excluded.channel_id, "
+                        "state = excluded.state, opener_id = COALESCE(tickets.opener_id, excluded.opener_id)",
+                        (guild.id, number, channel.id, opener_id, state, channel.created_at.timestamp())
+                    )
+            # Never move the counter backwards, so numbers of deleted channels are not reused
+            self.db.execute(
+                "INSERT INTO counters (guild_id, next_number) VALUES (?, ?) "
+                "ON CONFLICT(guild_id) DO UPDATE SET next_number = MAX(next_number, excluded.next_number)",
+                (guild.id, highest + 1)
+            )
+        self._count_open()
+        return highest
+
+
+class GuildResources:
+    """
+    Per-guild cache of the ticket categories, the support role and prebuilt permission overwrites.
+    Entries are dropped by the channel/role listeners in cogs/tickets.py, so lookups never scan guild lists.
+    The support role and category names come from the per-guild config.
+    """
+    def __init__(self, config):
+        self.config = config
+        self._guilds = {}
+        self._category_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, guild):
+        entry = self._guilds.get(guild.id)
+        if entry is None:
+            entry = self._guilds[guild.id] = {"categories": {}}
+        return entry
+
+    def category(self, guild, name):
+        categories = self._entry(guild)["categories"]
+        if name in categories:
+            category = guild.get_channel(categories[name])
+            if category is not None:
+                self.hits += 1
+                return category
+        self.misses += 1
+        category = discord.utils.get(guild.categories, name=name)
+        if category is not None:
+            categories[name] = category.id
+        return category
+
+    async def ensure_category(self, guild, name, overwrites=None):
+        category = self.category(guild, name)
+        if category is not None:
+            return category
+        # Concurrent first clicks must not create the category twice
+        lock = self._category_locks.setdefault((guild.id, name), asyncio.Lock())
+        async with lock:
+            category = self.category(guild, name)
+            if category is None:
+                category = await guild.create_category(name, overwrites=overwrites or {})
+                self._entry(guild)["categories"][name] = category.id
+        return category
+
+    def support_role(self, guild):
+        entry = self._entry(guild)
+        if "support_role" in entry:
+            self.hits += 1
+            return entry["support_role"]
+        self.misses += 1
+        role_id = self.config.get(guild.id, "support_role_id")
+        role = guild.get_role(role_id) if role_id != 0 else None
+        entry["support_role"] = role
+        return role
+
+    def ticket_overwrites(self, guild, opener):
+        """
+        Overwrites for a new ticket channel: the shared template plus the opener.
+        """
+        entry = self._entry(guild)
+        template = entry.get("ticket_overwrites")
+        if template is None:
+            self.misses += 1
+            # We give the bot extra permissions (embed_links) to ensure it can post the menu
+            template = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True, embed_links=True, attach_files=True)
+            }
+            support_role = self.support_role(guild)
+            if support_role:
+                template[support_role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
+            entry["ticket_overwrites"] = template
+        else:
+            self.hits += 1
+        overwrites = dict(template)
+        overwrites[opener] = OPENER_OVERWRITE
+        return overwrites
+
+    def closed_overwrites(self, guild):
+        entry = self._entry(guild)
+        template = entry.get("closed_overwrites")
+        if template is None:
+            self.misses += 1
+            template = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                guild.me: discord.PermissionOverwrite(read_messages=True)
+            }
+            support_role = self.support_role(guild)
+            if support_role:
+                template[support_role] = discord.PermissionOverwrite(read_messages=True)
+            entry["closed_overwrites"] = template
+        else:
+            self.hits += 1
+        return dict(template)
+
+    def invalidate_categories(self, guild_id):
+        entry = self._guilds.get(guild_id)
+        if entry:
+            entry["categories"].clear()
+
+    def invalidate_roles(self, guild_id):
+        entry = self._guilds.get(guild_id)
+        if entry:
+            for key in ("support_role", "ticket_overwrites", "closed_overwrites"):
+                entry.pop(key, None)
+
+    def forget(self, guild_id):
+        self._guilds.pop(guild_id, None)
+
+
+async def iter_history(channel, page_size=100):
+    """
+    Yields a channel's messages oldest-first, one page at a time, so only a single page is ever held in memory.
+    """
+    after = None
+    while True:
+        page = [message async for message in channel.history(limit=page_size, after=after, oldest_first=True)]
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        after = page[-1]
+
+
+def message_to_record(message, saved=None):
+    """
+    saved maps attachment id -> local copy made by save_attachments. Attachment URLs stop resolving once
+    the channel is deleted, so only attachments with a local copy stay readable after that.
+    """
+    saved = saved or {}
+    return {
+        "id": message.id,
+        "author_id": message.author.id,
+        "author": str(message.author),
+        "created_at": message.created_at.isoformat(),
+        "content": message.content,
+        "attachments": [
+            {"filename": attachment.filename, "size": attachment.size, "url": attachment.url, "saved": saved.get(attachment.id)}
+            for attachment in message.attachments
+        ],
+        "embeds": [embed.to_dict() for embed in message.embeds],
+    }
+
+
+async def save_attachments(messages, directory, max_bytes):
+    """
+    Downloads every attachment up to max_bytes into directory. Returns {attachment id: file path}.
+    Larger attachments, and ones that fail to download, keep only their URL in the transcript.
+    """
+    saved = {}
+    for message in messages:
+        for attachment in message.attachments:
+            if attachment.size > max_bytes:
+                continue
+            try:
+                data = await attachment.read()
+            except discord.HTTPException as e:
+                log.warning("Could not save attachment %s: %s", attachment.filename, e, extra={"message_id": message.id})
+                continue
+            path = os.path.join(directory, f"{attachment.id}-{os.path.basename(attachment.filename)}")
+            await asyncio.to_thread(write_file, path, data)
+            saved[attachment.id] = path
+    return saved
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def export_transcript(channel, path, attachment_dir=None, max_attachment_bytes=0):
+    """
+    Streams the channel history into a gzip-compressed JSONL file. Returns the number of messages written.
+    With attachment_dir set, attachments up to max_attachment_bytes are copied there (see save_attachments).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    count = 0
+    transcript = await asyncio.to_thread(gzip.open, path, "wt", encoding="utf-8")
+    try:
+        async for page in iter_history(channel):
+            saved = await save_attachments(page, attachment_dir, max_attachment_bytes) if attachment_dir else {}
+            lines = "".join(json.dumps(message_to_record(message, saved), ensure_ascii=False) + "\n" for message in page)
+            # File writes happen off the event loop
+            await asyncio.to_thread(transcript.write, lines)
+            count += len(page)
+    finally:
+        await asyncio.to_thread(transcript.close)
+    return count
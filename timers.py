@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import sqlite3
+import time
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# DISCONNECT TIMER SCHEDULER
+# ==============================================================================
+# One min-heap of deadlines driven by a single background loop, instead of one
+# sleeping asyncio task per member. Every timer is mirrored to SQLite so pending
+# disconnects survive a restart. The mirror is written behind: changes made in
+# one event loop iteration are committed together at the start of the next, in
+# WAL mode without an fsync per commit, so scheduling never waits on the disk.
+
+
+class DisconnectScheduler:
+    """
+    Pending disconnects keyed by (guild_id, member_id).
+    The heap keeps its own position map so cancelling a timer is O(log n).
+    """
+    def __init__(self, path, on_fire):
+        self.on_fire = on_fire
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS disconnect_timers ("
+            "guild_id INTEGER NOT NULL, member_id INTEGER NOT NULL, channel_id INTEGER, "
+            "deadline REAL NOT NULL, PRIMARY KEY (guild_id, member_id))"
+        )
+        self.db.commit()
+
+        self._heap = []  # [deadline, key, channel_id]
+        self._pos = {}   # key -> index in self._heap
+        self._wakeup = asyncio.Event()
+        self._firing = set()
+        self._writes = {}  # key -> row to store, or None to delete it; committed by flush()
+        self._flush_pending = False
+
+        # Reload timers that were pending when the bot last stopped
+        for guild_id, member_id, channel_id, deadline in self.db.execute(
+            "SELECT guild_id, member_id, channel_id, deadline FROM disconnect_timers"
+        ):
+            self._push([deadline, (guild_id, member_id), channel_id])
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, key):
+        return key in self._pos
+
+    def deadline(self, key):
+        index = self._pos.get(key)
+        return None if index is None else self._heap[index][0]
+
+    def schedule(self, guild_id, member_id, channel_id, deadline):
+        """
+        Adds or replaces the timer for a member. Wakes the loop if it is now the earliest one.
+        """
+        self.schedule_many([(guild_id, member_id, channel_id, deadline)])
+
+    def schedule_many(self, timers):
+        """
+        schedule() for many (guild_id, member_id, channel_id, deadline) at once.
+        """
+        timers = list(timers)
+        if not timers:
+            return
+        for guild_id, member_id, channel_id, deadline in timers:
+            key = (guild_id, member_id)
+            if key in self._pos:
+                self._remove(key)
+            self._push([deadline, key, channel_id])
+            self._write(key, (guild_id, member_id, channel_id, deadline))
+        if self._heap[0][1] in {(guild_id, member_id) for guild_id, member_id, _, _ in timers}:
+            self._wakeup.set()
+
+    def cancel(self, guild_id, member_id):
+        key = (guild_id, member_id)
+        if key not in self._pos:
+            return False
+        self._remove(key)
+        self._write(key, None)
+        return True
+
+    def pop_due(self, now):
+        """
+        Removes and returns every timer whose deadline has passed, as (guild_id, member_id, channel_id).
+        """
+        batch = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, key, channel_id = self._remove(self._heap[0][1])
+            batch.append((key[0], key[1], channel_id))
+            self._write(key, None)
+        return batch
+
+    def _write(self, key, row):
+        self._writes[key] = row
+        if not self._flush_pending:
+            self._flush_pending = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        """
+        Commits every change since the last flush in one transaction. Runs on its own once per
+        loop iteration; call it directly before shutting down.
+        """
+        self._flush_pending = False
+        if not self._writes:
+            return
+        writes, self._writes = self._writes, {}
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO disconnect_timers (guild_id, member_id, channel_id, deadline) "
+                "VALUES (?, ?, ?, ?)",
+                [row for row in writes.values() if row is not None]
+            )
+            self.db.executemany(
+                "DELETE FROM disconnect_timers WHERE guild_id = ? AND member_id = ?",
+                [key for key, row in writes.items() if row is None]
+            )
+
+    async def run(self):
+        """
+        The single background loop: sleep until the earliest deadline (or a new earlier one),
+        then hand every due timer to on_fire in one batch.
+        """
+        while True:
+            self._wakeup.clear()
+            batch = self.pop_due(time.time())
+            if batch:
+                # Fire in the background so a slow batch never delays the next deadline
+                task = asyncio.create_task(self._fire(batch))
+                self._firing.add(task)
+                task.add_done_callback(self._firing.discard)
+                continue
+
+            timeout = max(self._heap[0][0] - time.time(), 0) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, batch):
+        try:
+            await self.on_fire(batch)
+        except Exception:
+            log.exception("Error firing %s disconnect timers", len(batch))
+
+    # --------------------------------------------------------------------------
+    # Indexed heap internals
+    # --------------------------------------------------------------------------
+    def _push(self, entry):
+        self._heap.append(entry)
+        self._pos[entry[1]] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def _remove(self, key):
+        index = self._pos.pop(key)
+        entry = self._heap[index]
+        last = self._heap.pop()
+        if index < len(self._heap):
+            self._heap[index] = last
+            self._pos[last[1]] = index
+            self._sift_up(index)
+            self._sift_down(self._pos[last[1]])
+        return entry
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][1]] = i
+        self._pos[heap[j][1]] = j
+
+    def _sift_up(self, index):
+        while index > 0:
+            parent = (index - 1) // 2
+            if self._heap[index][0] >= self._heap[parent][0]:
+                break
+            self._swap(index, parent)
+            index = parent
+
+    def _sift_down(self, index):
+        size = len(self._heap)
+        while True:
+            smallest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and self._heap[child][0] < self._heap[smallest][0]:
+                    smallest = child
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest